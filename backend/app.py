@@ -1,21 +1,45 @@
-from flask import Flask, request, jsonify
+import time
+
+STARTUP_STARTED = time.perf_counter()
+
+from flask import Flask, request, jsonify, Response, stream_with_context, g
 from flask_pymongo import PyMongo
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
 from flask_cors import CORS
 from werkzeug.security import generate_password_hash, check_password_hash
 from dotenv import load_dotenv
 from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
+from pymongo import monitoring
+import click
 import os
-from PyPDF2 import PdfReader
 from groq import Groq
+from extraction import extract_document_text, extract_pdf_pages
 import re
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from rank_bm25 import BM25Okapi
 import logging
-from datetime import datetime
-import tempfile
-from docx import Document
+from datetime import datetime, timedelta, timezone
+import base64
+import gzip
+import hashlib
+import io
+import json
+import zipfile
+import zlib
+import math
+import random
+import multiprocessing
+import threading
+from contextlib import contextmanager
+from functools import lru_cache, wraps
+from concurrent.futures import (
+    FIRST_COMPLETED, BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor, wait,
+    TimeoutError as FutureTimeoutError
+)
+from collections import Counter, OrderedDict
+import numpy as np
+from scipy import sparse
 
 load_dotenv()
 
@@ -34,7 +58,6 @@ if not app.config["JWT_SECRET_KEY"]:
 if not groq_api_key:
     raise ValueError("GROQ_API_KEY must be set in environment variables")
 
-mongo = PyMongo(app, uri=app.config["MONGO_URI"])
 jwt = JWTManager(app)
 
 # Configure CORS
@@ -50,118 +73,1547 @@ CORS(app, resources={
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize Groq client
-client = Groq(api_key=groq_api_key)
+# Instrumentation. Metrics are kept per process and served in the Prometheus
+# text format from /metrics; scrape every worker to get the full picture.
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "1000"))
+SLOW_REQUEST_SAMPLE_RATE = float(os.getenv("SLOW_REQUEST_SAMPLE_RATE", "1.0"))
+DEBUG_LOG_SAMPLE_RATE = float(os.getenv("DEBUG_LOG_SAMPLE_RATE", "0.01"))
+METRIC_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def format_labels(label_names, values, extra=()):
+    pairs = list(zip(label_names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join('%s="%s"' % (name, str(value).replace('\\', '\\\\').replace('"', '\\"')) for name, value in pairs) + "}"
+
+class Histogram:
+    """Thread-safe Prometheus histogram with one series per label combination."""
+
+    def __init__(self, name, help_text, label_names=(), buckets=METRIC_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, value, **labels):
+        key = tuple(labels[name] for name in self.label_names)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0, 0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += 1
+            series[2] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (bucket_counts, count, total) in sorted(self._series.items()):
+                for bound, bucket_count in zip(self.buckets, bucket_counts):
+                    lines.append(f"{self.name}_bucket{format_labels(self.label_names, key, [('le', bound)])} {bucket_count}")
+                lines.append(f"{self.name}_bucket{format_labels(self.label_names, key, [('le', '+Inf')])} {count}")
+                lines.append(f"{self.name}_count{format_labels(self.label_names, key)} {count}")
+                lines.append(f"{self.name}_sum{format_labels(self.label_names, key)} {total}")
+        return lines
+
+class CounterMetric:
+    """Thread-safe Prometheus counter with one series per label combination."""
+
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._series = Counter()
+
+    def inc(self, amount=1, **labels):
+        with self._lock:
+            self._series[tuple(labels[name] for name in self.label_names)] += amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            lines.extend(f"{self.name}{format_labels(self.label_names, key)} {value}" for key, value in sorted(self._series.items()))
+        return lines
+
+stage_seconds = Histogram("gpms_stage_seconds", "Time spent in a hot-path stage.", ["stage"])
+mongo_command_seconds = Histogram("gpms_mongo_command_seconds", "MongoDB command latency.", ["command", "outcome"])
+llm_request_seconds = Histogram("gpms_llm_request_seconds", "Latency of LLM completions, including queueing.", ["model", "outcome"])
+llm_tokens_total = CounterMetric("gpms_llm_tokens_total", "Tokens used by LLM completions.", ["model", "kind"])
+http_request_seconds = Histogram("gpms_http_request_seconds", "HTTP request latency.", ["endpoint", "method", "status"])
+slow_requests_total = CounterMetric("gpms_slow_requests_total", "Requests slower than SLOW_REQUEST_MS.", ["endpoint"])
+METRICS = [stage_seconds, mongo_command_seconds, llm_request_seconds, llm_tokens_total, http_request_seconds, slow_requests_total]
+
+_trace = threading.local()
+
+def record_stage(stage, seconds):
+    """Record a stage duration and, if the current thread is serving a request, add it to its trace."""
+    stage_seconds.observe(seconds, stage=stage)
+    stages = getattr(_trace, "stages", None)
+    if stages is not None:
+        stages.append((stage, seconds))
+
+@contextmanager
+def timed_stage(stage):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - started)
+
+def debug_sampled():
+    """True for a DEBUG_LOG_SAMPLE_RATE fraction of calls when debug logging is on; guards payload logs."""
+    return logger.isEnabledFor(logging.DEBUG) and random.random() < DEBUG_LOG_SAMPLE_RATE
+
+class MongoCommandTimer(monitoring.CommandListener):
+    """Time every MongoDB command. Events fire on the thread that issued the command."""
+
+    def started(self, event):
+        pass
+
+    def _finish(self, event, outcome):
+        seconds = event.duration_micros / 1e6
+        mongo_command_seconds.observe(seconds, command=event.command_name, outcome=outcome)
+        stages = getattr(_trace, "stages", None)
+        if stages is not None:
+            stages.append((f"mongo:{event.command_name}", seconds))
+
+    def succeeded(self, event):
+        self._finish(event, "ok")
+
+    def failed(self, event):
+        self._finish(event, "error")
+
+mongo = PyMongo(app, uri=app.config["MONGO_URI"], event_listeners=[MongoCommandTimer()])
+
+@app.before_request
+def start_request_trace():
+    _trace.stages = []
+    _trace.started = time.perf_counter()
+
+@app.after_request
+def finish_request_trace(response):
+    started = getattr(_trace, "started", None)
+    if started is None:
+        return response
+    elapsed = time.perf_counter() - started
+    stages, _trace.stages, _trace.started = _trace.stages, None, None
+    endpoint = request.endpoint or "unmatched"
+    http_request_seconds.observe(elapsed, endpoint=endpoint, method=request.method, status=response.status_code)
+    if elapsed * 1000 >= SLOW_REQUEST_MS:
+        slow_requests_total.inc(endpoint=endpoint)
+        if random.random() < SLOW_REQUEST_SAMPLE_RATE:
+            breakdown = OrderedDict()
+            for stage, seconds in stages:
+                count, total = breakdown.get(stage, (0, 0.0))
+                breakdown[stage] = (count + 1, total + seconds)
+            logger.warning(f"Slow request {request.method} {request.path} took {elapsed * 1000:.0f} ms: " + (
+                ", ".join(f"{stage} {total * 1000:.1f} ms" + (f" x{count}" if count > 1 else "")
+                          for stage, (count, total) in breakdown.items()) or "no stages recorded"))
+    return response
+
+# Initialize Groq client (GROQ_BASE_URL can point at a local stand-in for testing)
+client = Groq(api_key=groq_api_key, base_url=os.getenv("GROQ_BASE_URL") or None)
+
+# Groq health check. Runs off the import path so a slow or unreachable API
+# never blocks startup; /api/health/ready reports the result.
+LLM_HEALTH_TTL = int(os.getenv("LLM_HEALTH_TTL", "300"))
+STARTUP_BUDGET_MS = int(os.getenv("STARTUP_BUDGET_MS", "1500"))
+
+llm_health = {"status": "unknown", "error": None, "checked_at": None}
+_llm_health_lock = threading.Lock()
 
-# Validate Groq API key
 def validate_groq_api_key():
+    """Check the Groq key by listing models (no tokens spent) and record the result in llm_health."""
     try:
-        client.chat.completions.create(
-            model="llama3-70b-8192",
-            messages=[{"role": "user", "content": "Test prompt"}],
-            max_tokens=10
-        )
+        client.models.list()
+        llm_health.update(status="ok", error=None, checked_at=time.time())
         logger.info("Groq API key validated successfully")
     except Exception as e:
+        llm_health.update(status="error", error=str(e), checked_at=time.time())
         logger.error(f"Invalid Groq API key: {str(e)}")
-        raise ValueError("Groq API key is invalid or lacks permissions")
+    return llm_health["status"] == "ok"
+
+def schedule_llm_health_check(force=False):
+    """Re-validate the Groq key on a background thread once the last result is older than LLM_HEALTH_TTL."""
+    checked_at = llm_health["checked_at"]
+    if not force and checked_at is not None and time.time() - checked_at < LLM_HEALTH_TTL:
+        return
+    if not _llm_health_lock.acquire(blocking=False):
+        return
+
+    def check():
+        try:
+            validate_groq_api_key()
+        finally:
+            _llm_health_lock.release()
 
-validate_groq_api_key()
+    threading.Thread(target=check, name="llm-health-check", daemon=True).start()
 
 # Helper Functions
-def extract_text_from_file(file, file_type):
-    """Extract text from PDF or DOCX files."""
+MAX_RESUME_BYTES = int(os.getenv("MAX_RESUME_BYTES", str(10 * 1024 * 1024)))
+MAX_RESUME_PAGES = int(os.getenv("MAX_RESUME_PAGES", "40"))
+PDF_PARALLEL_MIN_PAGES = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "12"))
+PDF_EXTRACT_WORKERS = int(os.getenv("PDF_EXTRACT_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+PDF_EXTRACT_TIMEOUT = float(os.getenv("PDF_EXTRACT_TIMEOUT", "30"))
+
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+
+def get_pdf_pool():
+    """Return the process pool used for parallel PDF/DOCX extraction.
+
+    Workers are started with forkserver (spawn where unavailable) rather than
+    fork: forking from a threaded server can copy a lock held by another thread
+    into the child and hang it. Pooled functions live in ``extraction``.
+    """
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            context = multiprocessing.get_context(method)
+            if method == "forkserver":
+                context.set_forkserver_preload(["extraction"])
+            _pdf_pool = ProcessPoolExecutor(max_workers=PDF_EXTRACT_WORKERS, mp_context=context)
+        return _pdf_pool
+
+def reset_pdf_pool():
+    """Drop the PDF pool and kill its workers, which may be stuck on a hostile document.
+
+    shutdown() alone leaves a busy worker running, so the processes are
+    terminated explicitly; the next extraction starts a fresh pool.
+    """
+    global _pdf_pool
+    with _pdf_pool_lock:
+        pool, _pdf_pool = _pdf_pool, None
+    if pool is None:
+        return
+    processes = list((pool._processes or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.terminate()
+
+def extract_pdf_text(content, parallel=True):
+    """Extract text from PDF bytes, spreading long documents over the process pool."""
+    from PyPDF2 import PdfReader
+    reader = PdfReader(io.BytesIO(content))
+    page_count = min(len(reader.pages), MAX_RESUME_PAGES)
+    if not parallel or page_count < PDF_PARALLEL_MIN_PAGES or PDF_EXTRACT_WORKERS < 2:
+        return [reader.pages[i].extract_text() or "" for i in range(page_count)]
+
+    # A document that outlives PDF_EXTRACT_TIMEOUT fails rather than being
+    # re-parsed here, where nothing could interrupt it. Only a pool that cannot
+    # start or has died falls back to extracting in this process.
+    chunk = math.ceil(page_count / PDF_EXTRACT_WORKERS)
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=f'.{file_type}') as temp_file:
-            file_content = file.read()
-            temp_file.write(file_content)
-            temp_file_path = temp_file.name
-        
-        text = ""
-        if file_type == "pdf":
-            reader = PdfReader(temp_file_path)
-            for page in reader.pages:
-                extracted = page.extract_text()
-                if extracted:
-                    text += extracted + "\n"
-        elif file_type == "docx":
-            doc = Document(temp_file_path)
-            text = "\n".join([para.text for para in doc.paragraphs if para.text.strip()])
-        
-        os.unlink(temp_file_path)
-        return text.strip() or None
+        futures = [
+            get_pdf_pool().submit(extract_pdf_pages, content, start, min(start + chunk, page_count))
+            for start in range(0, page_count, chunk)
+        ]
+        deadline = time.monotonic() + PDF_EXTRACT_TIMEOUT
+        return [text for future in futures for text in future.result(timeout=max(0, deadline - time.monotonic()))]
+    except FutureTimeoutError:
+        reset_pdf_pool()
+        raise TimeoutError(f"PDF extraction took longer than {PDF_EXTRACT_TIMEOUT}s") from None
+    except (BrokenExecutor, OSError, RuntimeError) as e:
+        reset_pdf_pool()
+        logger.warning(f"Parallel PDF extraction failed, falling back to sequential: {str(e) or type(e).__name__}")
+        return [reader.pages[i].extract_text() or "" for i in range(page_count)]
+
+def extract_text_from_file(file, file_type, parallel=True):
+    """Extract text from PDF or DOCX files.
+
+    ``file`` may be raw bytes, a memoryview or a readable stream; documents are
+    parsed in memory. Files above MAX_RESUME_BYTES are rejected and only the
+    first MAX_RESUME_PAGES pages of a PDF are read. ``parallel=False`` keeps
+    PDF pages in the calling process.
+    """
+    try:
+        content = file if isinstance(file, (bytes, bytearray, memoryview)) else file.read()
+        if len(content) > MAX_RESUME_BYTES:
+            logger.warning(f"Rejected {file_type} of {len(content)} bytes (limit {MAX_RESUME_BYTES})")
+            return None
+
+        with timed_stage(f"extract_{file_type}"):
+            if file_type == "pdf":
+                pages = extract_pdf_text(bytes(content), parallel)
+                return "\n".join(page for page in pages if page).strip() or None
+            return extract_document_text(bytes(content), file_type, MAX_RESUME_PAGES)
     except Exception as e:
         logger.error(f"Error extracting text from {file_type}: {str(e)}")
         return None
 
+SKILL_TOKEN_PATTERN = re.compile(r"[a-z0-9+#.]+")
+
+def skill_tokens(text):
+    """Lowercase ``text`` and split it into tokens that keep '+', '#' and inner dots (c++, c#, node.js)."""
+    return [token for token in (match.rstrip('.') for match in SKILL_TOKEN_PATTERN.findall(text.lower())) if token]
+
+class SkillMatcher:
+    """Single-pass, longest-match phrase matcher over a skill taxonomy.
+
+    The taxonomy maps each canonical skill to a list of aliases. Every name
+    is tokenized with skill_tokens() and inserted into a token trie, so
+    extraction walks the text once and costs O(len(text) * longest phrase)
+    regardless of how many skills the taxonomy holds.
+    """
+
+    def __init__(self, taxonomy):
+        self._root = {}
+        self.skills = sorted(taxonomy)
+        for canonical, aliases in taxonomy.items():
+            for phrase in [canonical, *aliases]:
+                node = self._root
+                for token in skill_tokens(phrase):
+                    node = node.setdefault(token, {})
+                # Tokens are never empty, so '' marks the end of a phrase
+                node[''] = canonical
+        self.version = hashlib.sha1(json.dumps(taxonomy, sort_keys=True).encode()).hexdigest()[:12]
+
+    def extract(self, text):
+        tokens = skill_tokens(text)
+        found = set()
+        i = 0
+        while i < len(tokens):
+            node, j, match, match_end = self._root, i, None, i
+            while j < len(tokens) and tokens[j] in node:
+                node = node[tokens[j]]
+                j += 1
+                if '' in node:
+                    match, match_end = node[''], j
+            if match:
+                found.add(match)
+                i = match_end
+            else:
+                i += 1
+        return found
+
+def load_skill_taxonomy(path):
+    with open(path, encoding='utf-8') as taxonomy_file:
+        return json.load(taxonomy_file)
+
+skill_matcher = SkillMatcher(load_skill_taxonomy(
+    os.getenv("SKILL_TAXONOMY_PATH") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "skills.json")
+))
+
 def extract_technical_skills(text):
     """Extract technical skills from text."""
-    technical_keywords = {
-        'python', 'java', 'javascript', 'c++', 'sql', 'react', 'node.js', 'aws',
-        'docker', 'kubernetes', 'machine learning', 'data analysis', 'git', 'linux'
+    return skill_matcher.extract(text)
+
+@lru_cache(maxsize=None)
+def get_tfidf_analyzer():
+    """Build the TF-IDF analyzer on first use (importing sklearn costs over a second)."""
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    return TfidfVectorizer(stop_words='english').build_analyzer()
+
+def tfidf_analyzer(text):
+    return get_tfidf_analyzer()(text)
+
+class LRUCache:
+    """Thread-safe LRU mapping bounded by an approximate byte budget.
+
+    ``sizeof`` estimates the footprint of a value; least recently used entries
+    are evicted once the total exceeds ``max_bytes``. Entries older than
+    ``ttl`` seconds (if set) are treated as missing.
+    """
+
+    def __init__(self, max_bytes, sizeof, ttl=None):
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._size = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl and time.monotonic() - entry[2] > self.ttl:
+                self._pop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value):
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._pop(key)
+            self._entries[key] = (value, size, time.monotonic())
+            self._size += size
+            while self._size > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+
+    def _pop(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+def resume_features(resume_text, skills=None):
+    """Tokenize a resume once for every scorer that needs it (``skills`` may be a stored skill set)."""
+    return {
+        'text': resume_text,
+        'terms': tfidf_analyzer(resume_text),
+        'tokens': resume_text.split(),
+        'skills': extract_technical_skills(resume_text) if skills is None else skills
     }
-    words = set(re.findall(r'\b\w+\b', text.lower()))
-    return words.intersection(technical_keywords)
 
-def calculate_matching_scores(resume_text, job_text):
-    """Calculate matching scores between resume and job."""
+def _resume_features_size(features):
+    return (len(features['text'])
+            + sum(len(term) for term in features['terms'])
+            + sum(len(token) for token in features['tokens'])) * 2
+
+resume_cache = LRUCache(
+    max_bytes=int(os.getenv("RESUME_CACHE_MAX_BYTES", str(64 * 1024 * 1024))),
+    sizeof=_resume_features_size
+)
+use_mongo_resume_cache = os.getenv("RESUME_CACHE_MONGO", "").lower() in ("1", "true", "yes")
+
+def resume_hash(content, file_type):
+    return hashlib.sha256(file_type.encode() + b':' + content).hexdigest()
+
+def get_cached_resume(content_hash):
+    """Look parsed resume features up in the in-process LRU, then in MongoDB if enabled."""
+    features = resume_cache.get(content_hash)
+    if features is not None:
+        return features
+
+    if use_mongo_resume_cache:
+        try:
+            cached = mongo.db.resume_cache.find_one({"_id": content_hash})
+            if cached:
+                features = {
+                    'text': cached['text'],
+                    'terms': cached['terms'],
+                    'tokens': cached['tokens'],
+                    'skills': set(cached['skills']) if cached.get('skills_version') == skill_matcher.version
+                              else extract_technical_skills(cached['text'])
+                }
+                resume_cache.set(content_hash, features)
+                return features
+        except Exception as e:
+            logger.warning(f"Resume cache lookup failed: {str(e)}")
+    return None
+
+def store_cached_resume(content_hash, features):
+    resume_cache.set(content_hash, features)
+    if use_mongo_resume_cache:
+        try:
+            mongo.db.resume_cache.update_one(
+                {"_id": content_hash},
+                {"$set": {
+                    **features,
+                    'skills': sorted(features['skills']),
+                    'skills_version': skill_matcher.version,
+                    'cached_at': datetime.now()
+                }},
+                upsert=True
+            )
+        except Exception as e:
+            logger.warning(f"Resume cache store failed: {str(e)}")
+
+def load_resume(file, file_type):
+    """Extract and tokenize an uploaded resume, reusing earlier work for identical files.
+
+    Results are keyed by the SHA-256 of the file bytes and looked up in the
+    in-process LRU first and then, when RESUME_CACHE_MONGO is enabled, in the
+    shared ``resume_cache`` collection. Returns None if no text could be
+    extracted.
+    """
+    content = file.read()
+    content_hash = resume_hash(content, file_type)
+
+    features = get_cached_resume(content_hash)
+    if features is not None:
+        return features
+
+    resume_text = extract_text_from_file(content, file_type)
+    if not resume_text:
+        return None
+    features = resume_features(resume_text)
+    store_cached_resume(content_hash, features)
+    return features
+
+def iter_load_resumes(uploads):
+    """Parse many uploaded resumes, extracting cache misses in parallel.
+
+    ``uploads`` is a list of (content, file_type) pairs. Yields
+    (position, features) as each resume becomes available, in completion
+    order; features is None when no text could be extracted.
+    """
+    pending = {}
+    for position, (content, file_type) in enumerate(uploads):
+        content_hash = resume_hash(content, file_type)
+        features = get_cached_resume(content_hash)
+        if features is not None:
+            yield position, features
+        else:
+            pending[position] = (content_hash, content, file_type)
+
+    if not pending:
+        return
+
+    def finish(position, content_hash, resume_text):
+        features = None
+        if resume_text:
+            features = resume_features(resume_text)
+            store_cached_resume(content_hash, features)
+        return position, features
+
+    # Workers get bare bytes and limits; timing, logging and the size check stay
+    # in this process. When a batch makes no progress for PDF_EXTRACT_TIMEOUT
+    # seconds the pool is killed and the unfinished files count as failed.
+    # Files are only extracted here if the pool cannot start or dies.
+    done = set()
+    futures = {}
+    try:
+        for position, (content_hash, content, file_type) in pending.items():
+            if len(content) > MAX_RESUME_BYTES:
+                continue
+            future = get_pdf_pool().submit(extract_document_text, bytes(content), file_type, MAX_RESUME_PAGES)
+            futures[future] = position
+    except Exception as e:
+        reset_pdf_pool()
+        logger.warning(f"Could not start parallel resume extraction, extracting sequentially: {str(e)}")
     try:
-        vectorizer = TfidfVectorizer(stop_words='english')
-        tfidf_matrix = vectorizer.fit_transform([job_text, resume_text])
-        cosine_sim = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0] * 100
+        not_done = set(futures)
+        while not_done:
+            finished, not_done = wait(not_done, timeout=PDF_EXTRACT_TIMEOUT, return_when=FIRST_COMPLETED)
+            if not finished:
+                reset_pdf_pool()
+                logger.warning(f"{len(not_done)} resumes not extracted within {PDF_EXTRACT_TIMEOUT}s, marking them failed")
+                for future in not_done:
+                    done.add(futures[future])
+                    yield futures[future], None
+                break
+            for future in finished:
+                position = futures[future]
+                content_hash, _, file_type = pending[position]
+                try:
+                    resume_text = future.result()
+                except BrokenExecutor:
+                    raise
+                except Exception as e:
+                    logger.error(f"Error extracting text from {file_type}: {str(e)}")
+                    resume_text = None
+                done.add(position)
+                yield finish(position, content_hash, resume_text)
+    except BrokenExecutor as e:
+        reset_pdf_pool()
+        logger.warning(f"Parallel resume extraction failed, falling back to sequential: {str(e)}")
+
+    for position, (content_hash, content, file_type) in pending.items():
+        if position not in done:
+            yield finish(position, content_hash, extract_text_from_file(content, file_type, False))
+
+def resume_text_id(text):
+    return hashlib.sha256(text.encode()).hexdigest()
+
+def store_resume_text(text):
+    """Store ``text`` zlib-compressed in the ``resumes`` collection, once per content hash, and return the hash.
+
+    ``last_used_at`` is refreshed on every call so compaction never prunes a
+    resume that an application is about to reference.
+    """
+    resume_id = resume_text_id(text)
+    now = datetime.now()
+    mongo.db.resumes.update_one(
+        {"_id": resume_id},
+        {
+            "$set": {"last_used_at": now},
+            "$setOnInsert": {"text": zlib.compress(text.encode(), 6), "size": len(text), "created_at": now}
+        },
+        upsert=True
+    )
+    return resume_id
+
+def load_resume_texts(applications):
+    """Map application _id to resume text, reading the referenced resumes in one query.
+
+    Applications stored before resumes were split out still embed
+    ``resume_text`` (until `flask compact-applications` moves it).
+    """
+    texts = {a["_id"]: a["resume_text"] for a in applications if a.get("resume_text")}
+    resume_ids = {a["resume_id"] for a in applications if a["_id"] not in texts and a.get("resume_id")}
+    if resume_ids:
+        stored = {
+            doc["_id"]: zlib.decompress(doc["text"]).decode()
+            for doc in mongo.db.resumes.find({"_id": {"$in": list(resume_ids)}})
+        }
+        texts.update((a["_id"], stored[a["resume_id"]]) for a in applications if a.get("resume_id") in stored and a["_id"] not in texts)
+    return texts
+
+def stored_resume_skills(application):
+    """Skills saved on an application, or None if they were extracted with an older taxonomy."""
+    if application.get("skills_version") == skill_matcher.version and "resume_skills" in application:
+        return set(application["resume_skills"])
+    return None
+
+APPLICATION_RESUME_PROJECTION = {"resume_text": 1, "resume_id": 1, "resume_skills": 1, "skills_version": 1}
+
+def build_job_text(job):
+    """Concatenate the scoring-relevant fields of a job posting."""
+    return ' '.join(filter(None, [job.get('position', ''), job.get('description', ''), job.get('requirements', '')]))
+
+def get_job_skills(job):
+    """Return a job's skill set, using the copy stored on the document when it is current."""
+    if job.get('skills_version') == skill_matcher.version and 'skills' in job:
+        return set(job['skills'])
+    return extract_technical_skills(build_job_text(job))
+
+def job_skill_fields(job):
+    """Fields that store a job's precomputed skills on its document."""
+    return {'skills': sorted(extract_technical_skills(build_job_text(job))), 'skills_version': skill_matcher.version}
+
+class JobVectorIndex:
+    """Approximate nearest-neighbour index over dense job embeddings.
+
+    Jobs are embedded by hashing their terms into a sparse term-frequency
+    vector and projecting it onto ``dimensions`` dense components with a
+    fixed-seed random projection, so embeddings are deterministic and can be
+    persisted. Vectors are clustered with k-means into about sqrt(N) inverted
+    lists (IVF); a query only scans the ``nprobe`` lists closest to it.
+    """
+
+    HASH_FEATURES = 2 ** 20
+
+    def __init__(self, path=None, dimensions=256, nprobe=8, save_delay=5.0):
+        self.path = path
+        self.dimensions = dimensions
+        self.nprobe = nprobe
+        self.save_delay = save_delay
+        self._save_timer = None
+        self._lock = threading.RLock()
+        self._hasher = None
+        self._components = None
+        self._vectors = {}
+        self._centroids = None
+        self._trained_size = 0
+        self._arrays = None
+        self._dirty = False
+
+    def __len__(self):
+        return len(self._vectors)
+
+    def _get_embedder(self):
+        with self._lock:
+            if self._hasher is None:
+                from sklearn.feature_extraction.text import HashingVectorizer
+                from sklearn.random_projection import SparseRandomProjection
+                projection = SparseRandomProjection(n_components=self.dimensions, random_state=0)
+                projection.fit(sparse.csr_matrix((1, self.HASH_FEATURES)))
+                # Kept as (features x dimensions) CSR so projecting a hashed row is a cheap sparse product
+                self._components = projection.components_.T.tocsr()
+                self._hasher = HashingVectorizer(stop_words='english', n_features=self.HASH_FEATURES, alternate_sign=False)
+            return self._hasher, self._components
+
+    def embed(self, texts):
+        """Embed texts as L2-normalized float32 rows."""
+        from sklearn.preprocessing import normalize
+        hasher, components = self._get_embedder()
+        return normalize((hasher.transform(texts) @ components).toarray()).astype(np.float32)
+
+    @staticmethod
+    def _text_hash(text):
+        return hashlib.sha1(text.encode()).hexdigest()
+
+    def sync(self, texts):
+        """Make the index hold exactly the jobs in ``texts`` ({job_id: job_text}).
+
+        Only jobs that are new or whose text changed are embedded again.
+        Returns the number of jobs added, changed or dropped.
+        """
+        with self._lock:
+            changed = [job_id for job_id, text in texts.items()
+                       if self._vectors.get(job_id, (None,))[0] != self._text_hash(text)]
+            dropped = [job_id for job_id in self._vectors if job_id not in texts]
+            for job_id in dropped:
+                del self._vectors[job_id]
+            if changed:
+                vectors = self.embed([texts[job_id] for job_id in changed])
+                for job_id, vector in zip(changed, vectors):
+                    self._vectors[job_id] = (self._text_hash(texts[job_id]), vector)
+            if changed or dropped:
+                self._arrays = None
+                self._dirty = True
+            return len(changed) + len(dropped)
+
+    def upsert(self, job_id, text):
+        with self._lock:
+            self._vectors[job_id] = (self._text_hash(text), self.embed([text])[0])
+            self._arrays = None
+            self._dirty = True
+
+    def remove(self, job_id):
+        with self._lock:
+            if self._vectors.pop(job_id, None) is not None:
+                self._arrays = None
+                self._dirty = True
+
+    def schedule_save(self):
+        """Save in the background after ``save_delay`` seconds, so a burst of edits is written once."""
+        with self._lock:
+            if not self.path or self._save_timer is not None:
+                return
+            self._save_timer = threading.Timer(self.save_delay, self._save_scheduled)
+            self._save_timer.daemon = True
+            self._save_timer.start()
+
+    def _save_scheduled(self):
+        with self._lock:
+            self._save_timer = None
+        try:
+            self.save()
+        except Exception as e:
+            logger.warning(f"Could not save ANN index to {self.path}: {str(e)}")
+
+    def _train(self, matrix):
+        from sklearn.cluster import MiniBatchKMeans
+        from sklearn.preprocessing import normalize
+        n_lists = max(1, int(math.sqrt(len(matrix))))
+        kmeans = MiniBatchKMeans(n_clusters=n_lists, random_state=0, n_init=3, batch_size=1024).fit(matrix)
+        self._centroids = normalize(kmeans.cluster_centers_).astype(np.float32)
+        self._trained_size = len(matrix)
+        self._dirty = True
+
+    def _get_arrays(self):
+        with self._lock:
+            if self._arrays is None:
+                job_ids = list(self._vectors)
+                matrix = np.stack([self._vectors[job_id][1] for job_id in job_ids]) if job_ids else np.zeros((0, self.dimensions), np.float32)
+                if job_ids and (self._centroids is None or not self._trained_size / 2 <= len(job_ids) <= self._trained_size * 2):
+                    self._train(matrix)
+                assignments = (matrix @ self._centroids.T).argmax(axis=1) if job_ids else np.zeros(0, int)
+                lists = [np.flatnonzero(assignments == i) for i in range(len(self._centroids))] if job_ids else []
+                self._arrays = (job_ids, matrix, lists)
+            return self._arrays
+
+    def search(self, text, n):
+        """Return the ids of up to ``n`` jobs closest to ``text``, best first."""
+        job_ids, matrix, lists = self._get_arrays()
+        if not job_ids:
+            return []
+        query = self.embed([text])[0]
+        probes = np.argsort(-(self._centroids @ query))[:self.nprobe]
+        members = np.concatenate([lists[i] for i in probes])
+        if len(members) > n:
+            members = members[np.argpartition(-(matrix[members] @ query), n - 1)[:n]]
+        members = members[np.argsort(-(matrix[members] @ query), kind='stable')]
+        return [job_ids[row] for row in members]
+
+    def save(self):
+        """Persist vectors and centroids to ``path`` (atomically) if anything changed."""
+        with self._lock:
+            if not self.path or not self._dirty:
+                return
+            job_ids, matrix, _ = self._get_arrays()
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as index_file:
+                np.savez(
+                    index_file,
+                    job_ids=np.array(job_ids, dtype=str),
+                    hashes=np.array([self._vectors[job_id][0] for job_id in job_ids], dtype=str),
+                    vectors=matrix,
+                    centroids=self._centroids if self._centroids is not None else np.zeros((0, self.dimensions), np.float32),
+                    trained_size=self._trained_size
+                )
+            os.replace(temp_path, self.path)
+            self._dirty = False
+
+    def load(self):
+        """Load a previously saved index; returns False if there is none or it does not fit."""
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with np.load(self.path) as data:
+                if data['vectors'].shape[1] != self.dimensions:
+                    return False
+                with self._lock:
+                    self._vectors = {
+                        str(job_id): (str(text_hash), vector)
+                        for job_id, text_hash, vector in zip(data['job_ids'], data['hashes'], data['vectors'])
+                    }
+                    self._centroids = data['centroids'] if len(data['centroids']) else None
+                    self._trained_size = int(data['trained_size'])
+                    self._arrays = None
+                    self._dirty = False
+            logger.info(f"Loaded ANN index with {len(self._vectors)} jobs from {self.path}")
+            return True
+        except Exception as e:
+            logger.warning(f"Could not load ANN index from {self.path}: {str(e)}")
+            return False
+
+class JobIndex:
+    """Corpus-wide TF-IDF, BM25 and skill index over every job posting.
+
+    Term counts are kept per job so that creating, editing or deleting a
+    company only touches that job's statistics; the sparse matrices used for
+    scoring are rebuilt lazily on the next query.  Scores combine TF-IDF
+    cosine similarity, BM25 and skill overlap (0.4/0.3/0.3) with IDF values
+    taken from the whole job corpus.
+    """
+
+    BM25_K1 = 1.5
+    BM25_B = 0.75
+    BM25_EPSILON = 0.25
+
+    def __init__(self, max_age=300, vector_index=None, ann_min_jobs=1000, ann_candidates=100,
+                 version_source=None, change_source=None):
+        self.max_age = max_age
+        self.version_source = version_source
+        self.change_source = change_source
+        self.vector_index = vector_index
+        self.ann_min_jobs = ann_min_jobs
+        self.ann_candidates = ann_candidates
+        self._lock = threading.RLock()
+        self._jobs = {}
+        self._tfidf_df = Counter()
+        self._bm25_df = Counter()
+        self._snapshot = None
+        self._loaded_at = None
+        self._version = None
+
+    def _make_entry(self, job):
+        job_text = build_job_text(job)
+        if not job_text.strip():
+            return None
+        bm25_tokens = job_text.split()
+        return {
+            'job': job,
+            'tfidf_counts': Counter(tfidf_analyzer(job_text)),
+            'bm25_counts': Counter(bm25_tokens),
+            'bm25_length': len(bm25_tokens),
+            'skills': get_job_skills(job)
+        }
 
-        bm25 = BM25Okapi([job_text.split()])
-        bm25_score = min(bm25.get_scores(resume_text.split())[0] / 10.0, 1.0) * 100
+    def _add(self, job_id, entry):
+        self._jobs[job_id] = entry
+        self._tfidf_df.update(entry['tfidf_counts'].keys())
+        self._bm25_df.update(entry['bm25_counts'].keys())
+
+    def _discard(self, job_id):
+        entry = self._jobs.pop(job_id, None)
+        if entry:
+            self._tfidf_df.subtract(entry['tfidf_counts'].keys())
+            self._bm25_df.subtract(entry['bm25_counts'].keys())
+            self._tfidf_df += Counter()
+            self._bm25_df += Counter()
+
+    def _read_version(self):
+        if self.version_source is None:
+            return None
+        try:
+            return self.version_source()
+        except Exception as e:
+            logger.warning(f"Could not read job index version: {str(e)}")
+            return self._version
+
+    def load(self, collection):
+        """Rebuild the index from every document in ``collection``."""
+        with self._lock:
+            # Read the version first: a write landing during the scan bumps it
+            # again and triggers another reload instead of being missed.
+            self._version = self._read_version()
+            self._jobs = {}
+            self._tfidf_df = Counter()
+            self._bm25_df = Counter()
+            for job in collection.find({}):
+                entry = self._make_entry(job)
+                if entry:
+                    self._add(str(job['_id']), entry)
+            self._snapshot = None
+            self._loaded_at = time.monotonic()
+            logger.info(f"Job index built over {len(self._jobs)} jobs")
+            if self.vector_index is not None:
+                if not len(self.vector_index):
+                    self.vector_index.load()
+                self.vector_index.sync({job_id: build_job_text(entry['job']) for job_id, entry in self._jobs.items()})
+                self.vector_index.save()
+
+    def ensure_loaded(self, collection):
+        """Load the index on first use and keep it in step with the shared version.
+
+        Each worker process keeps its own index; company writes bump the
+        version returned by ``version_source``. When it moved, the jobs that
+        ``change_source`` lists for the missing versions are re-read and
+        patched in; the index is only rebuilt if the change log has a gap.
+        ``max_age`` is a backstop for writes that bypass the API.
+        """
+        version = self._read_version()
+        with self._lock:
+            if self._loaded_at is None or (self.max_age and time.monotonic() - self._loaded_at > self.max_age):
+                with timed_stage("job_index_load"):
+                    self.load(collection)
+            elif version != self._version and not self._catch_up(collection, version):
+                with timed_stage("job_index_load"):
+                    self.load(collection)
+
+    def _catch_up(self, collection, version):
+        """Apply the logged company changes up to ``version``; False if they cannot all be found."""
+        if self.change_source is None or self._version is None or version is None or version < self._version:
+            return False
+        try:
+            job_ids = self.change_source(self._version, version)
+        except Exception as e:
+            logger.warning(f"Could not read job index changes: {str(e)}")
+            return False
+        if job_ids is None:
+            return False
+        jobs = {job['_id']: job for job in collection.find({"_id": {"$in": list(set(job_ids))}})}
+        for job_id in set(job_ids):
+            if job_id in jobs:
+                self.upsert(jobs[job_id])
+            else:
+                self.remove(job_id)
+        self._version = version
+        return True
+
+    def _advance_version(self, version):
+        # Only the write that moved the shared version by one was applied here;
+        # if other writes happened in between, leave the gap so we reload.
+        if version is not None and self._version is not None and version == self._version + 1:
+            self._version = version
+
+    def upsert(self, job, version=None):
+        """Add or replace a single job after it was created or edited.
+
+        ``version`` is the shared version the write bumped to, if known.
+        """
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            self._advance_version(version)
+            job_id = str(job['_id'])
+            self._discard(job_id)
+            entry = self._make_entry(job)
+            if entry:
+                self._add(job_id, entry)
+            self._snapshot = None
+            if self.vector_index is not None:
+                if entry:
+                    self.vector_index.upsert(job_id, build_job_text(job))
+                else:
+                    self.vector_index.remove(job_id)
+                self.vector_index.schedule_save()
+
+    def ensure_job(self, job):
+        """Index ``job`` if it is missing or indexed with outdated text (e.g. edited by another worker)."""
+        with self._lock:
+            entry = self._jobs.get(str(job['_id']))
+            if build_job_text(job).strip() and (entry is None or build_job_text(entry['job']) != build_job_text(job)):
+                self.upsert(job)
+
+    def remove(self, job_id, version=None):
+        """Drop a job after it was deleted."""
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            self._advance_version(version)
+            self._discard(str(job_id))
+            self._snapshot = None
+            if self.vector_index is not None:
+                self.vector_index.remove(str(job_id))
+                self.vector_index.schedule_save()
+
+    def _build_snapshot(self):
+        job_ids = list(self._jobs)
+        entries = [self._jobs[job_id] for job_id in job_ids]
+        n_jobs = len(entries)
+
+        tfidf_vocab = {term: i for i, term in enumerate(self._tfidf_df)}
+        tfidf_idf = np.array([math.log((1 + n_jobs) / (1 + self._tfidf_df[term])) + 1 for term in tfidf_vocab])
+
+        bm25_vocab = {term: i for i, term in enumerate(self._bm25_df)}
+        bm25_idf = np.array([math.log(n_jobs - self._bm25_df[term] + 0.5) - math.log(self._bm25_df[term] + 0.5) for term in bm25_vocab])
+        if len(bm25_idf):
+            # Same epsilon floor as rank_bm25, but never negative: terms present
+            # in most postings should contribute little, not penalise a match.
+            bm25_idf[bm25_idf < 0] = self.BM25_EPSILON * max(bm25_idf.mean(), 0.0)
+        avg_length = sum(entry['bm25_length'] for entry in entries) / max(n_jobs, 1)
+
+        skill_vocab = {skill: i for i, skill in enumerate(sorted(set().union(*(entry['skills'] for entry in entries))))}
+
+        tfidf_rows, tfidf_cols, tfidf_vals = [], [], []
+        bm25_rows, bm25_cols, bm25_vals = [], [], []
+        skill_rows, skill_cols = [], []
+        for row, entry in enumerate(entries):
+            cols = [tfidf_vocab[term] for term in entry['tfidf_counts']]
+            vals = np.fromiter(entry['tfidf_counts'].values(), dtype=float) * tfidf_idf[cols]
+            norm = np.linalg.norm(vals)
+            tfidf_rows.extend([row] * len(cols))
+            tfidf_cols.extend(cols)
+            tfidf_vals.extend(vals / norm if norm else vals)
+
+            length_norm = self.BM25_K1 * (1 - self.BM25_B + self.BM25_B * entry['bm25_length'] / avg_length)
+            for term, freq in entry['bm25_counts'].items():
+                bm25_rows.append(row)
+                bm25_cols.append(bm25_vocab[term])
+                bm25_vals.append(freq * (self.BM25_K1 + 1) / (freq + length_norm))
+
+            skill_rows.extend([row] * len(entry['skills']))
+            skill_cols.extend(skill_vocab[skill] for skill in entry['skills'])
 
-        job_skills = extract_technical_skills(job_text)
-        resume_skills = extract_technical_skills(resume_text)
-        skill_match = len(job_skills.intersection(resume_skills)) / max(len(job_skills), 1) * 100
+        return {
+            'job_ids': job_ids,
+            'rows': {job_id: row for row, job_id in enumerate(job_ids)},
+            'jobs': [entry['job'] for entry in entries],
+            'tfidf_vocab': tfidf_vocab,
+            'tfidf_idf': tfidf_idf,
+            'tfidf_matrix': sparse.csr_matrix((tfidf_vals, (tfidf_rows, tfidf_cols)), shape=(n_jobs, len(tfidf_vocab))),
+            'bm25_vocab': bm25_vocab,
+            'bm25_idf': bm25_idf,
+            'bm25_matrix': sparse.csr_matrix((bm25_vals, (bm25_rows, bm25_cols)), shape=(n_jobs, len(bm25_vocab))),
+            'skill_vocab': skill_vocab,
+            'skill_matrix': sparse.csr_matrix((np.ones(len(skill_rows)), (skill_rows, skill_cols)), shape=(n_jobs, len(skill_vocab))),
+            'skill_counts': np.array([len(entry['skills']) for entry in entries], dtype=float)
+        }
 
-        overall_match = (0.4 * cosine_sim + 0.3 * bm25_score + 0.3 * skill_match)
-        
+    @property
+    def job_count(self):
+        return len(self._jobs)
+
+    def _get_snapshot(self):
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = self._build_snapshot()
+            return self._snapshot
+
+    @staticmethod
+    def _query_matrix(rows, vocab, weights=None):
+        """Build an (n_resumes x vocab) sparse matrix of term counts, optionally weighted."""
+        row_ids, cols, vals = [], [], []
+        for row, tokens in enumerate(rows):
+            for term, freq in Counter(tokens).items():
+                col = vocab.get(term)
+                if col is not None:
+                    row_ids.append(row)
+                    cols.append(col)
+                    vals.append(freq if weights is None else freq * weights[col])
+        return sparse.csr_matrix((vals, (row_ids, cols)), shape=(len(rows), len(vocab)))
+
+    def _resume_matrices(self, snapshot, features_list):
+        from sklearn.preprocessing import normalize
+        tfidf_query = normalize(self._query_matrix([f['terms'] for f in features_list], snapshot['tfidf_vocab'], snapshot['tfidf_idf']))
+        bm25_query = self._query_matrix([f['tokens'] for f in features_list], snapshot['bm25_vocab'], snapshot['bm25_idf'])
+        skill_query = self._query_matrix([list(f['skills']) for f in features_list], snapshot['skill_vocab'])
+        return tfidf_query, bm25_query, skill_query
+
+    @staticmethod
+    def _combine(cosine, bm25_raw, skill_hits, skill_counts):
+        cosine_sim = np.asarray(cosine).ravel() * 100
+        bm25_score = np.clip(np.asarray(bm25_raw).ravel() / 10.0, 0.0, 1.0) * 100
+        skill_match = np.asarray(skill_hits).ravel() / np.maximum(skill_counts, 1) * 100
         return {
-            'overall_match': overall_match,
+            'overall_match': 0.4 * cosine_sim + 0.3 * bm25_score + 0.3 * skill_match,
             'tfidf_similarity': cosine_sim,
             'bm25_score': bm25_score,
             'technical_match': skill_match
         }
+
+    def _score_rows(self, snapshot, features, rows=None):
+        with timed_stage("query_vectors"):
+            tfidf_query, bm25_query, skill_query = self._resume_matrices(snapshot, [features])
+        select = (lambda matrix: matrix) if rows is None else (lambda matrix: matrix[rows])
+        with timed_stage("tfidf"):
+            cosine = (select(snapshot['tfidf_matrix']) @ tfidf_query.T).toarray()
+        with timed_stage("bm25"):
+            bm25_raw = (select(snapshot['bm25_matrix']) @ bm25_query.T).toarray()
+        with timed_stage("skill_match"):
+            skill_hits = (select(snapshot['skill_matrix']) @ skill_query.T).toarray()
+        return self._combine(cosine, bm25_raw, skill_hits, select(snapshot['skill_counts']))
+
+    def score(self, resume_text, features=None):
+        """Score ``resume_text`` against every indexed job.
+
+        ``features`` may carry the cached output of resume_features() so the
+        resume is not tokenized again. Returns the snapshot and a dict of
+        per-job score arrays (0-100 scale).
+        """
+        features = features or resume_features(resume_text)
+        snapshot = self._get_snapshot()
+        return snapshot, self._score_rows(snapshot, features)
+
+    def score_resumes(self, job_id, features_list):
+        """Score many resumes against one indexed job in a single vectorized pass.
+
+        Returns a dict of per-resume score arrays (0-100 scale), or None if the
+        job is not in the index.
+        """
+        snapshot = self._get_snapshot()
+        row = snapshot['rows'].get(str(job_id))
+        if row is None:
+            return None
+        if not features_list:
+            return {name: np.zeros(0) for name in ('overall_match', 'tfidf_similarity', 'bm25_score', 'technical_match')}
+        with timed_stage("score_resumes"):
+            tfidf_query, bm25_query, skill_query = self._resume_matrices(snapshot, features_list)
+            return self._combine(
+                (tfidf_query @ snapshot['tfidf_matrix'][row].T).toarray(),
+                (bm25_query @ snapshot['bm25_matrix'][row].T).toarray(),
+                (skill_query @ snapshot['skill_matrix'][row].T).toarray(),
+                snapshot['skill_counts'][row]
+            )
+
+    def top_k(self, resume_text, k=5, min_score=30, features=None, exhaustive=False):
+        """Return up to ``k`` (job, scores) pairs above ``min_score``, best first.
+
+        With a vector index and at least ``ann_min_jobs`` jobs, only the
+        ``ann_candidates`` nearest jobs are scored, unless ``exhaustive``.
+        """
+        features = features or resume_features(resume_text)
+        snapshot = self._get_snapshot()
+        rows = None
+        if not exhaustive and self.vector_index is not None and len(snapshot['job_ids']) >= self.ann_min_jobs:
+            with timed_stage("ann_search"):
+                rows = np.array([
+                    snapshot['rows'][job_id]
+                    for job_id in self.vector_index.search(features['text'], self.ann_candidates)
+                    if job_id in snapshot['rows']
+                ], dtype=int)
+        scores = self._score_rows(snapshot, features, rows)
+        if rows is None:
+            rows = np.arange(len(snapshot['job_ids']))
+
+        overall = scores['overall_match']
+        candidates = np.flatnonzero(overall > min_score)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-overall[candidates], k - 1)[:k]]
+        candidates = candidates[np.argsort(-overall[candidates], kind='stable')]
+        return [
+            (snapshot['jobs'][rows[i]], {name: float(values[i]) for name, values in scores.items()})
+            for i in candidates
+        ]
+
+# How long the company change log used by JobIndex._catch_up is kept
+COMPANY_CHANGE_LOG_TTL = int(os.getenv("COMPANY_CHANGE_LOG_TTL", str(24 * 3600)))
+
+job_index = JobIndex(
+    max_age=int(os.getenv("JOB_INDEX_MAX_AGE", "300")),
+    vector_index=JobVectorIndex(
+        path=os.getenv("ANN_INDEX_PATH") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "ann_index.npz"),
+        nprobe=int(os.getenv("ANN_NPROBE", "8")),
+        save_delay=float(os.getenv("ANN_SAVE_DELAY", "5"))
+    ) if os.getenv("RECOMMENDER_ANN", "").lower() in ("1", "true", "yes") else None,
+    ann_min_jobs=int(os.getenv("ANN_MIN_JOBS", "10000")),
+    ann_candidates=int(os.getenv("ANN_CANDIDATES", "100")),
+    version_source=lambda: get_data_version("companies")[0],
+    change_source=lambda after, upto: company_changes_between(after, upto)
+)
+
+def score_for_job(job, features_list):
+    """Score resumes against one job with the corpus-wide index.
+
+    Stored application scores, screening and recommendations all use this
+    scorer, so the same resume and job get the same numbers everywhere.
+    """
+    job_index.ensure_loaded(mongo.db.companies)
+    job_index.ensure_job(job)
+    scores = job_index.score_resumes(job['_id'], features_list)
+    if scores is None:
+        return [{'overall_match': 0.0, 'tfidf_similarity': 0.0, 'bm25_score': 0.0, 'technical_match': 0.0} for _ in features_list]
+    return [{name: float(values[i]) for name, values in scores.items()} for i in range(len(features_list))]
+
+JOB_TEXT_FIELDS = ('position', 'description', 'requirements')
+RESCORE_BATCH_SIZE = int(os.getenv("RESCORE_BATCH_SIZE", "200"))
+
+rescore_pool = ThreadPoolExecutor(max_workers=int(os.getenv("RESCORE_WORKERS", "2")), thread_name_prefix="rescore")
+_rescore_lock = threading.Lock()
+_rescoring = set()
+
+def rescore_applications(job_id, version):
+    """Recompute stored scores for a job's applications older than ``version``.
+
+    Applications are processed in _id order in batches of RESCORE_BATCH_SIZE
+    and each write only applies if the application has not meanwhile been
+    scored at a newer version. Stops early if the job moves past ``version``.
+    """
+    job_oid = ObjectId(job_id)
+    stale = {"job_id": job_oid, "$or": [{"score_version": {"$lt": version}}, {"score_version": {"$exists": False}}]}
+    last_id = None
+    rescored = 0
+    try:
+        while True:
+            job = mongo.db.companies.find_one({"_id": job_oid})
+            if not job or job.get("score_version", 0) != version:
+                logger.info(f"Rescoring of job {job_id} at v{version} superseded")
+                return
+            query = dict(stale, **({"_id": {"$gt": last_id}} if last_id else {}))
+            batch = list(mongo.db.applications.find(query, APPLICATION_RESUME_PROJECTION).sort("_id", 1).limit(RESCORE_BATCH_SIZE))
+            if not batch:
+                break
+            last_id = batch[-1]["_id"]
+            texts = load_resume_texts(batch)
+            batch = [application for application in batch if application["_id"] in texts]
+            scores = score_for_job(job, [
+                resume_features(texts[application["_id"]], stored_resume_skills(application)) for application in batch
+            ])
+
+            updates = [
+                UpdateOne(
+                    {"_id": application["_id"], "$or": [{"score_version": {"$lt": version}}, {"score_version": {"$exists": False}}]},
+                    {"$set": {"scores": application_scores, "score_version": version}}
+                )
+                for application, application_scores in zip(batch, scores)
+            ]
+            if updates:
+                mongo.db.applications.bulk_write(updates, ordered=False)
+                bump_data_version(f"applications:{job_id}")
+                rescored += len(updates)
+        if rescored:
+            rebuild_job_stats(job_oid)
+        logger.info(f"Rescored {rescored} applications for job {job_id} at v{version}")
     except Exception as e:
-        logger.error(f"Score calculation error: {str(e)}")
-        return {'overall_match': 0, 'tfidf_similarity': 0, 'bm25_score': 0, 'technical_match': 0}
+        logger.error(f"Rescoring job {job_id} failed: {str(e)}")
+    finally:
+        with _rescore_lock:
+            _rescoring.discard((job_id, version))
+
+def schedule_rescore(job_id, version):
+    """Queue a background rescore unless one for this job version is already queued."""
+    key = (str(job_id), version)
+    with _rescore_lock:
+        if key in _rescoring:
+            return
+        _rescoring.add(key)
+    rescore_pool.submit(rescore_applications, *key)
+
+LLM_MODELS = [
+    "llama3-70b-8192",
+]
+
+llm_cache = LRUCache(
+    max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", str(16 * 1024 * 1024))),
+    sizeof=lambda content: len(content) * 2,
+    ttl=int(os.getenv("LLM_CACHE_TTL", "3600")) or None
+)
+use_mongo_llm_cache = os.getenv("LLM_CACHE_MONGO", "").lower() in ("1", "true", "yes")
+llm_cache_stats = Counter()
+
+def llm_cache_key(model, prompt, max_tokens, temperature):
+    """Key a completion by model, whitespace-normalized prompt and sampling parameters."""
+    normalized_prompt = " ".join(prompt.split())
+    return hashlib.sha256(json.dumps([model, normalized_prompt, max_tokens, temperature]).encode()).hexdigest()
+
+def get_cached_completion(key):
+    """Look a completion up in the in-process cache, then in MongoDB if enabled."""
+    content = llm_cache.get(key)
+    if content is not None:
+        llm_cache_stats['memory_hits'] += 1
+        return content
+
+    if use_mongo_llm_cache:
+        try:
+            cached = mongo.db.llm_cache.find_one({"_id": key, "expires_at": {"$gt": datetime.now()}})
+            if cached:
+                llm_cache.set(key, cached['content'])
+                llm_cache_stats['mongo_hits'] += 1
+                return cached['content']
+        except Exception as e:
+            logger.warning(f"LLM cache lookup failed: {str(e)}")
+
+    llm_cache_stats['misses'] += 1
+    return None
+
+def store_cached_completion(key, content):
+    llm_cache.set(key, content)
+    if use_mongo_llm_cache:
+        try:
+            mongo.db.llm_cache.update_one(
+                {"_id": key},
+                {"$set": {"content": content, "expires_at": datetime.now() + timedelta(seconds=llm_cache.ttl or 86400)}},
+                upsert=True
+            )
+        except Exception as e:
+            logger.warning(f"LLM cache store failed: {str(e)}")
+
+class LLMOverloadedError(Exception):
+    """Raised when too many LLM calls are already running or queued."""
+
+class LLMExecutor:
+    """Bounded thread pool for upstream LLM calls.
+
+    At most ``max_concurrency`` calls (pooled calls and streams together) run
+    at once and ``max_pending`` may be running or queued; further submissions
+    fail fast with LLMOverloadedError.
+    Calls sharing a key while one is in flight wait on the same future instead
+    of issuing another request.
+    """
+
+    def __init__(self, max_concurrency, max_pending, timeout):
+        self.timeout = timeout
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="llm")
+        self._slots = threading.BoundedSemaphore(max(max_pending, max_concurrency))
+        self._running = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.RLock()
+        self._inflight = {}
+        self.coalesced = 0
+
+    def _finish(self, key, future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+        self._slots.release()
+
+    def acquire_slot(self):
+        """Reserve a pending slot for a call made outside the pool, such as a stream.
+
+        Returns a callback that frees the slot; calling it more than once is safe.
+        """
+        if not self._slots.acquire(blocking=False):
+            raise LLMOverloadedError("LLM request queue is full")
+        released = []
+
+        def release():
+            with self._lock:
+                if released:
+                    return
+                released.append(True)
+            self._slots.release()
+        return release
+
+    @contextmanager
+    def running(self):
+        """Hold one of the ``max_concurrency`` slots shared by pooled calls and streams."""
+        if not self._running.acquire(timeout=self.timeout):
+            raise TimeoutError(f"LLM call did not start within {self.timeout}s")
+        try:
+            yield
+        finally:
+            self._running.release()
+
+    def _call(self, fn):
+        with self.running():
+            return fn()
+
+    def run(self, key, fn):
+        """Run ``fn`` on the pool, sharing the call with any in-flight one for ``key``."""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+            else:
+                if not self._slots.acquire(blocking=False):
+                    raise LLMOverloadedError("LLM request queue is full")
+                future = self._pool.submit(self._call, fn)
+                self._inflight[key] = future
+                future.add_done_callback(lambda done: self._finish(key, done))
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            raise TimeoutError(f"LLM call did not finish within {self.timeout}s")
+
+llm_executor = LLMExecutor(
+    max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+    max_pending=int(os.getenv("LLM_MAX_PENDING", "32")),
+    timeout=float(os.getenv("LLM_TIMEOUT", "30"))
+)
+
+def record_llm_usage(model, usage):
+    """Count the prompt and completion tokens reported for one completion."""
+    if usage is not None:
+        llm_tokens_total.inc(getattr(usage, "prompt_tokens", 0) or 0, model=model, kind="prompt")
+        llm_tokens_total.inc(getattr(usage, "completion_tokens", 0) or 0, model=model, kind="completion")
+
+def request_completion(model, prompt, max_tokens, temperature):
+    """Call Groq once and return the completion text."""
+    response = client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "system", "content": "You are a helpful assistant providing professional, concise responses."},
+            {"role": "user", "content": prompt}
+        ],
+        max_tokens=max_tokens,
+        temperature=temperature,
+        timeout=llm_executor.timeout
+    )
+    content = response.choices[0].message.content
+    record_llm_usage(model, getattr(response, "usage", None))
+    if debug_sampled():
+        logger.debug(f"Groq API response content: {content}")
+    return content
 
 def try_text_generation(prompt, max_tokens=500, temperature=0.7):
-    """Attempt text generation with fallback Groq models."""
-    models = [
-        "llama3-70b-8192",
-    ]
-    for model in models:
+    """Attempt text generation with fallback Groq models.
+
+    Identical requests (same model, normalized prompt, max_tokens and
+    temperature) are answered from the LLM response cache; calls run on
+    llm_executor and raise LLMOverloadedError when its queue is full.
+    """
+    for model in LLM_MODELS:
+        key = llm_cache_key(model, prompt, max_tokens, temperature)
+        content = get_cached_completion(key)
+        if content is not None:
+            return content
+        started = time.perf_counter()
+        try:
+            content = llm_executor.run(key, lambda: request_completion(model, prompt, max_tokens, temperature))
+            llm_request_seconds.observe(time.perf_counter() - started, model=model, outcome="ok")
+            record_stage("llm", time.perf_counter() - started)
+            store_cached_completion(key, content)
+            return content
+        except LLMOverloadedError:
+            llm_request_seconds.observe(time.perf_counter() - started, model=model, outcome="overloaded")
+            raise
+        except Exception as e:
+            llm_request_seconds.observe(time.perf_counter() - started, model=model, outcome="error")
+            logger.warning(f"Failed with model {model}: {str(e)}")
+    raise Exception("All model attempts failed")
+
+def stream_text_generation(prompt, max_tokens=500, temperature=0.7):
+    """Yield completion text as it arrives, using Groq's streamed completions.
+
+    A cached completion is yielded as a single chunk; a streamed one is cached
+    once it has been received in full. A model that fails before its first
+    chunk falls back to the next one; a failure mid-stream is raised.
+    """
+    for model in LLM_MODELS:
+        key = llm_cache_key(model, prompt, max_tokens, temperature)
+        content = get_cached_completion(key)
+        if content is not None:
+            yield content
+            return
+        started = time.perf_counter()
         try:
-            response = client.chat.completions.create(
+            stream = client.chat.completions.create(
                 model=model,
                 messages=[
                     {"role": "system", "content": "You are a helpful assistant providing professional, concise responses."},
                     {"role": "user", "content": prompt}
                 ],
                 max_tokens=max_tokens,
-                temperature=temperature
+                temperature=temperature,
+                timeout=llm_executor.timeout,
+                stream=True
             )
-            content = response.choices[0].message.content
-            logger.info(f"Groq API response content: {content}")
-            return content
         except Exception as e:
+            llm_request_seconds.observe(time.perf_counter() - started, model=model, outcome="error")
             logger.warning(f"Failed with model {model}: {str(e)}")
+            continue
+        parts = []
+        usage = None
+        try:
+            for chunk in stream:
+                # Groq reports usage on the final chunk, under x_groq
+                usage = getattr(chunk, "usage", None) or getattr(getattr(chunk, "x_groq", None), "usage", None) or usage
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    parts.append(delta)
+                    yield delta
+        except GeneratorExit:
+            llm_request_seconds.observe(time.perf_counter() - started, model=model, outcome="cancelled")
+            raise
+        except Exception as e:
+            llm_request_seconds.observe(time.perf_counter() - started, model=model, outcome="error")
+            logger.warning(f"Stream from model {model} failed: {str(e)}")
+            if parts:
+                raise
+            continue
+        content = "".join(parts)
+        llm_request_seconds.observe(time.perf_counter() - started, model=model, outcome="ok")
+        record_stage("llm", time.perf_counter() - started)
+        record_llm_usage(model, usage)
+        if debug_sampled():
+            logger.debug(f"Groq API streamed content: {content}")
+        store_cached_completion(key, content)
+        return
     raise Exception("All model attempts failed")
 
-def generate_interview_questions(resume_text):
-    """Generate 5 interview questions based on resume."""
-    prompt = f"""Based on this resume:
+def iter_numbered_items(chunks):
+    """Yield each numbered list item ('1. ...') as soon as its line is complete."""
+    buffer = ""
+    for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield from re.findall(r'\d+\.\s*(.+)', line)
+    yield from re.findall(r'\d+\.\s*(.+)', buffer)
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def wants_stream():
+    """Whether the client asked for Server-Sent Events instead of a JSON body."""
+    return (request.args.get('stream', '').lower() in ('1', 'true', 'yes')
+            or 'text/event-stream' in request.headers.get('Accept', ''))
+
+def stream_numbered_items(prompt, empty_error, limit=5):
+    """Stream the numbered items of a completion as Server-Sent Events.
+
+    Emits one ``item`` event per list item, then ``done`` once ``limit`` items
+    were sent or the completion ended, or ``error`` if nothing usable came
+    back. The remainder of the completion is still read so it can be cached.
+    """
+    release_slot = llm_executor.acquire_slot()
+
+    def generate():
+        count = 0
+        try:
+            with llm_executor.running():
+                for item in iter_numbered_items(stream_text_generation(prompt)):
+                    if count < limit:
+                        yield sse_event('item', {'index': count, 'text': item})
+                    count += 1
+                    if count == limit:
+                        yield sse_event('done', {'count': count})
+            if not count:
+                yield sse_event('error', {'error': empty_error})
+            elif count < limit:
+                yield sse_event('done', {'count': count})
+        except Exception as e:
+            logger.error(f"Streaming generation error: {str(e)}")
+            yield sse_event('error', {'error': empty_error})
+        finally:
+            release_slot()
+
+    response = Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    # The generator never starts if the client goes away before the body is read
+    response.call_on_close(release_slot)
+    return response
+
+def resume_improvements_prompt(resume_text):
+    return f"""Based on this resume:
+{resume_text}
+Provide exactly 5 specific, professional suggestions to improve the resume. Focus on clarity, relevance, and impact. Output the suggestions in a numbered list, starting with '1. ', '2. ', etc., one suggestion per line. Each suggestion should be concise and actionable."""
+
+def interview_questions_prompt(resume_text):
+    return f"""Based on this resume:
 {resume_text}
 Generate 5 specific interview questions relevant to the candidate's experience and skills. Output each question in a numbered list, starting with '1. ', '2. ', etc., one question per line."""
-    
+
+def generate_interview_questions(resume_text):
+    """Generate 5 interview questions based on resume."""
+    prompt = interview_questions_prompt(resume_text)
+
     try:
         response = try_text_generation(prompt)
         questions = re.findall(r'\d+\.\s*(.+)', response)
         return questions[:5]
+    except LLMOverloadedError:
+        raise
     except Exception as e:
         logger.error(f"Error generating questions: {str(e)}")
         return []
@@ -170,8 +1622,772 @@ def allowed_file(filename):
     """Check if file has allowed extension."""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in {'pdf', 'docx'}
 
+MAX_BATCH_RESUMES = int(os.getenv("MAX_BATCH_RESUMES", "500"))
+MAX_BATCH_BYTES = int(os.getenv("MAX_BATCH_BYTES", str(200 * 1024 * 1024)))
+
+def collect_batch_uploads():
+    """Gather (filename, content, file_type) triples from the 'resumes' files.
+
+    Each uploaded file may be a PDF, a DOCX or a zip archive of them; other
+    entries are ignored. Raises ValueError above MAX_BATCH_RESUMES resumes or
+    MAX_BATCH_BYTES of (decompressed) resume data, before reading the entry
+    that would cross either limit.
+    """
+    uploads = []
+    total_bytes = 0
+
+    def check_limits(size):
+        if len(uploads) >= MAX_BATCH_RESUMES:
+            raise ValueError(f"At most {MAX_BATCH_RESUMES} resumes can be screened at once")
+        if total_bytes + size > MAX_BATCH_BYTES:
+            raise ValueError(f"At most {MAX_BATCH_BYTES} bytes of resumes can be screened at once")
+
+    for upload in request.files.getlist('resumes'):
+        if upload.filename.lower().endswith('.zip'):
+            with zipfile.ZipFile(upload.stream) as archive:
+                for info in archive.infolist():
+                    if info.is_dir() or not allowed_file(info.filename):
+                        continue
+                    if info.file_size > MAX_RESUME_BYTES:
+                        logger.warning(f"Skipped {info.filename}: {info.file_size} bytes")
+                        continue
+                    # file_size is enforced by zipfile while reading, so it bounds the decompressed entry
+                    check_limits(info.file_size)
+                    content = archive.read(info)
+                    total_bytes += len(content)
+                    uploads.append((info.filename, content, info.filename.rsplit('.', 1)[1].lower()))
+        elif allowed_file(upload.filename):
+            content = upload.read()
+            check_limits(len(content))
+            total_bytes += len(content)
+            uploads.append((upload.filename, content, upload.filename.rsplit('.', 1)[1].lower()))
+    return uploads
+
+def rank_screened_resumes(job_id, candidates, features):
+    """Score parsed resumes against a job in one pass and rank them by overall match."""
+    scored = [position for position, resume in enumerate(features) if resume]
+    scores = job_index.score_resumes(job_id, [features[position] for position in scored])
+    order = np.argsort(-scores['overall_match'], kind='stable')
+    return {
+        'job_id': job_id,
+        'results': [
+            {**candidates[scored[i]], 'scores': {name: float(values[i]) for name, values in scores.items()}}
+            for i in order
+        ],
+        'failed': [candidates[position] for position, resume in enumerate(features) if not resume],
+        'total': len(candidates)
+    }
+
+MAX_APPLICATIONS_PAGE = 500
+APPLICATION_LIST_PROJECTION = {"user_id": 1, "scores": 1, "score_version": 1, "status": 1, "applied_at": 1}
+APPLICATION_LIST_SORT = [("scores.overall_match", DESCENDING), ("_id", DESCENDING)]
+
+def encode_applications_cursor(application):
+    """Encode the sort key of the last application on a page as an opaque cursor."""
+    key = [application["scores"]["overall_match"], str(application["_id"])]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+def decode_applications_cursor(cursor):
+    score, last_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    return float(score), ObjectId(last_id)
+
+# (collection, keys, options) for every index the application relies on
+INDEXES = [
+    ("users", [("email", ASCENDING)], {"name": "email_unique", "unique": True}),
+    ("companies", [("hr_code", ASCENDING)], {"name": "hr_code"}),
+    ("applications", [("job_id", ASCENDING), ("scores.overall_match", DESCENDING), ("_id", DESCENDING)], {"name": "job_id_overall_match"}),
+    ("applications", [("job_id", ASCENDING), ("status", ASCENDING)], {"name": "job_id_status"}),
+    ("llm_cache", [("expires_at", ASCENDING)], {"name": "expires_at_ttl", "expireAfterSeconds": 0}),
+    ("resume_cache", [("cached_at", ASCENDING)], {"name": "cached_at_ttl", "expireAfterSeconds": 30 * 24 * 3600}),
+    ("tasks", [("user_id", ASCENDING), ("idempotency_key", ASCENDING)], {"name": "user_idempotency_key", "unique": True}),
+    ("tasks", [("created_at", ASCENDING)], {"name": "created_at_ttl", "expireAfterSeconds": 7 * 24 * 3600}),
+    ("company_changes", [("created_at", ASCENDING)], {"name": "created_at_ttl", "expireAfterSeconds": COMPANY_CHANGE_LOG_TTL}),
+    ("applications", [("task_id", ASCENDING)], {
+        "name": "task_id_unique", "unique": True, "partialFilterExpression": {"task_id": {"$exists": True}}
+    }),
+]
+
+# (description, collection, filter, sort) for the queries that must never scan a collection
+HOT_QUERIES = [
+    ("login / signup by email", "users", {"email": "probe@example.com"}, None),
+    ("user by id", "users", {"_id": ObjectId()}, None),
+    ("company by hr_code", "companies", {"hr_code": "probe"}, None),
+    ("applications for a job", "applications", {"job_id": ObjectId()}, APPLICATION_LIST_SORT),
+    ("rejected applications for a job", "applications", {"job_id": ObjectId(), "status": "rejected"}, None),
+]
+
+def ensure_indexes():
+    """Create the indexes the hot queries rely on (a no-op if they already exist)."""
+    for collection, keys, options in INDEXES:
+        try:
+            mongo.db[collection].create_index(keys, **options)
+        except Exception as e:
+            logger.error(f"Could not create index {options['name']} on {collection}: {str(e)}")
+
+def plan_stages(plan):
+    """Collect every stage name in an explain() plan tree."""
+    if isinstance(plan, dict):
+        stages = [plan["stage"]] if "stage" in plan else []
+        for value in plan.values():
+            stages.extend(plan_stages(value))
+        return stages
+    if isinstance(plan, list):
+        return [stage for item in plan for stage in plan_stages(item)]
+    return []
+
+def check_query_plans():
+    """Explain each hot query; return (description, stages) for those that use a COLLSCAN."""
+    failures = []
+    for description, collection, query, sort in HOT_QUERIES:
+        cursor = mongo.db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        stages = plan_stages(cursor.explain().get("queryPlanner", {}).get("winningPlan", {}))
+        logger.info(f"{description}: {' <- '.join(stages)}")
+        if "COLLSCAN" in stages:
+            failures.append((description, stages))
+    return failures
+
+@app.cli.command("ensure-indexes")
+def ensure_indexes_command():
+    """Create all MongoDB indexes."""
+    ensure_indexes()
+    click.echo("Indexes ensured")
+
+@app.cli.command("backfill-job-skills")
+def backfill_job_skills_command():
+    """Store precomputed skills on every job whose copy is missing or outdated."""
+    updates = [
+        UpdateOne({"_id": job["_id"]}, {"$set": job_skill_fields(job)})
+        for job in mongo.db.companies.find({"skills_version": {"$ne": skill_matcher.version}})
+    ]
+    if updates:
+        mongo.db.companies.bulk_write(updates, ordered=False)
+        bump_data_version("companies")
+    click.echo(f"Updated skills on {len(updates)} jobs")
+
+@app.cli.command("ann-recall")
+@click.option("--sample", default=200, help="Number of stored resumes to use as queries.")
+@click.option("--k", default=5, help="Number of recommendations compared per query.")
+def ann_recall_command(sample, k):
+    """Measure recall@k and latency of ANN recommendations against the exhaustive path."""
+    if job_index.vector_index is None:
+        raise click.UsageError("Set RECOMMENDER_ANN=1 to enable the vector index")
+    job_index.load(mongo.db.companies)
+    queries = [zlib.decompress(doc["text"]).decode() for doc in mongo.db.resumes.aggregate([
+        {"$sample": {"size": sample}}
+    ])]
+    if not queries:
+        raise click.UsageError("No stored resumes to query with")
+
+    hits = total = 0
+    timings = {"exhaustive": [], "ann": []}
+    for text in queries:
+        features = resume_features(text)
+        results = {}
+        for mode in timings:
+            started = time.perf_counter()
+            results[mode] = {str(job["_id"]) for job, _ in job_index.top_k(text, k=k, min_score=0, features=features, exhaustive=mode == "exhaustive")}
+            timings[mode].append(time.perf_counter() - started)
+        hits += len(results["exhaustive"] & results["ann"])
+        total += len(results["exhaustive"])
+
+    click.echo(f"{job_index.job_count} jobs, {len(queries)} queries, recall@{k}: {hits / max(total, 1):.3f}")
+    for mode, values in timings.items():
+        click.echo(f"{mode}: p50 {np.percentile(values, 50) * 1000:.2f} ms, p99 {np.percentile(values, 99) * 1000:.2f} ms")
+
+@app.cli.command("compact-applications")
+@click.option("--batch-size", default=500, help="Applications rewritten per bulk write.")
+@click.option("--grace-minutes", default=60, help="Keep unreferenced resumes used this recently.")
+def compact_applications_command(batch_size, grace_minutes):
+    """Move resume text embedded in applications into the resumes collection and drop unreferenced resumes."""
+    started = datetime.now()
+    moved = 0
+    while True:
+        batch = list(mongo.db.applications.find({"resume_text": {"$exists": True}}, {"resume_text": 1}).limit(batch_size))
+        if not batch:
+            break
+        mongo.db.applications.bulk_write([
+            UpdateOne({"_id": application["_id"]}, {
+                "$set": {
+                    "resume_id": store_resume_text(application["resume_text"] or ""),
+                    "resume_skills": sorted(extract_technical_skills(application["resume_text"] or "")),
+                    "skills_version": skill_matcher.version
+                },
+                "$unset": {"resume_text": ""}
+            })
+            for application in batch
+        ], ordered=False)
+        moved += len(batch)
+
+    # An apply stores (or re-touches) its resume before inserting the application,
+    # so only prune resumes unused for the grace period, and re-check that at
+    # delete time in case one was reused after the scan.
+    cutoff = started - timedelta(minutes=grace_minutes)
+    stale = {"$or": [
+        {"last_used_at": {"$lt": cutoff}},
+        {"last_used_at": {"$exists": False}, "created_at": {"$lt": cutoff}}
+    ]}
+    referenced = set(mongo.db.applications.distinct("resume_id"))
+    orphans = [doc["_id"] for doc in mongo.db.resumes.find(stale, {"_id": 1}) if doc["_id"] not in referenced]
+    removed = 0
+    if orphans:
+        removed = mongo.db.resumes.delete_many({"$and": [{"_id": {"$in": orphans}}, stale]}).deleted_count
+    click.echo(f"Moved resume text out of {moved} applications, removed {removed} unreferenced resumes")
+
+@app.cli.command("rebuild-dashboard-stats")
+def rebuild_dashboard_stats_command():
+    """Recount the dashboard stats of every job from its applications."""
+    job_ids = [job["_id"] for job in mongo.db.companies.find({}, {"_id": 1})]
+    for job_id in job_ids:
+        rebuild_job_stats(job_id)
+    mongo.db.job_stats.delete_many({"_id": {"$nin": job_ids}})
+    click.echo(f"Rebuilt stats for {len(job_ids)} jobs")
+
+@app.cli.command("check-query-plans")
+def check_query_plans_command():
+    """Fail if any hot query is planned as a collection scan."""
+    failures = check_query_plans()
+    for description, stages in failures:
+        click.echo(f"COLLSCAN: {description} ({' <- '.join(stages)})", err=True)
+    if failures:
+        raise SystemExit(1)
+    click.echo(f"All {len(HOT_QUERIES)} hot queries use an index")
+
+def ensure_indexes_in_background():
+    try:
+        ensure_indexes()
+    except Exception as e:
+        logger.warning(f"Could not create MongoDB indexes: {str(e)}")
+
+# Build indexes off the import path so a slow or unavailable MongoDB does not block startup.
+# Skipped in extraction pool workers, which re-import this module when it is __main__.
+if multiprocessing.current_process().name == "MainProcess":
+    threading.Thread(target=ensure_indexes_in_background, name="ensure-indexes", daemon=True).start()
+
+def warmup(load_jobs=False):
+    """Import the parsing and scoring stacks that are otherwise loaded on first use.
+
+    Meant to run once in a preloading server's master process (PRELOAD_WARMUP=1
+    with gunicorn --preload) so forked workers share the loaded modules instead
+    of paying for them on their first request. ``load_jobs`` also builds the job
+    index, which opens a MongoDB connection and so should not be used pre-fork.
+    """
+    started = time.perf_counter()
+    import PyPDF2, docx  # noqa: F401
+    from sklearn.cluster import MiniBatchKMeans  # noqa: F401
+    from sklearn.metrics.pairwise import cosine_similarity  # noqa: F401
+    from sklearn.random_projection import SparseRandomProjection  # noqa: F401
+    get_tfidf_analyzer()
+    if load_jobs:
+        job_index.ensure_loaded(mongo.db.companies)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    logger.info(f"Warmup finished in {elapsed_ms:.0f} ms")
+    return elapsed_ms
+
+@app.cli.command("warmup")
+@click.option("--load-jobs", is_flag=True, help="Also build the job index from MongoDB.")
+def warmup_command(load_jobs):
+    """Load the scoring and parsing stacks ahead of the first request."""
+    click.echo(f"Warmup finished in {warmup(load_jobs):.0f} ms")
+
+@app.cli.command("startup-time")
+@click.option("--runs", default=3, help="Number of cold imports to time.")
+def startup_time_command(runs):
+    """Time a cold import of the app in fresh interpreters and fail above STARTUP_BUDGET_MS."""
+    import subprocess
+    import sys
+    app_dir = os.path.dirname(os.path.abspath(__file__))
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, "-c", "import app; print(app.STARTUP_MS)"],
+                                cwd=app_dir, check=True, capture_output=True, text=True)
+        timings.append(float(result.stdout.split()[-1]))
+    best = min(timings)
+    click.echo(f"Cold start: best {best:.0f} ms, worst {max(timings):.0f} ms (budget {STARTUP_BUDGET_MS} ms)")
+    if best > STARTUP_BUDGET_MS:
+        raise SystemExit(1)
+
+def create_application(user_id, job, resume, task_id=None):
+    """Score a parsed resume against a job and store the application.
+
+    With ``task_id`` at most one application is stored per task; a repeated
+    run returns the id of the one already stored.
+    """
+    if task_id is not None:
+        existing = mongo.db.applications.find_one({"task_id": task_id}, {"_id": 1})
+        if existing:
+            return existing["_id"]
+    scores = score_for_job(job, [resume])[0]
+    application = {
+        'user_id': ObjectId(user_id),
+        'job_id': job['_id'],
+        'resume_id': store_resume_text(resume['text']),
+        'resume_skills': sorted(resume['skills']),
+        'skills_version': skill_matcher.version,
+        'scores': scores,
+        'score_version': job.get('score_version', 0),
+        'status': 'pending',
+        'applied_at': datetime.now()
+    }
+    if task_id is not None:
+        application['task_id'] = task_id
+    try:
+        application_id = mongo.db.applications.insert_one(application).inserted_id
+    except DuplicateKeyError:
+        return mongo.db.applications.find_one({"task_id": task_id}, {"_id": 1})["_id"]
+    record_new_application(application)
+    bump_data_version(f"applications:{job['_id']}")
+    return application_id
+
+# Dashboard aggregates: one job_stats document per job holds its application
+# counts by status, an overall-match histogram and the top candidates. The
+# write paths keep it current with atomic $inc/$push updates, so the
+# dashboard reads one small document per job instead of every application.
+# A job without a job_stats document (e.g. one that had applications before
+# these stats existed) is recounted in full on its next write or dashboard read.
+DASHBOARD_TOP_N = int(os.getenv("DASHBOARD_TOP_N", "10"))
+# Statuses an application can take; they double as by_status field names
+APPLICATION_STATUSES = ("pending", "accepted", "rejected")
+SCORE_HISTOGRAM_BINS = 10
+TOP_CANDIDATE_PROJECTION = {"user_id": 1, "scores.overall_match": 1, "status": 1}
+
+def score_bin(scores):
+    """Histogram bin (as a string key) for an application's overall match."""
+    overall = (scores or {}).get("overall_match") or 0
+    return str(max(0, min(int(overall * SCORE_HISTOGRAM_BINS // 100), SCORE_HISTOGRAM_BINS - 1)))
+
+def top_candidate(application):
+    return {
+        "application_id": application["_id"],
+        "user_id": application["user_id"],
+        "overall_match": application["scores"]["overall_match"],
+        "status": application["status"]
+    }
+
+def record_new_application(application):
+    """Count a newly stored application in its job's stats."""
+    try:
+        result = mongo.db.job_stats.update_one(
+            {"_id": application["job_id"]},
+            {
+                "$inc": {
+                    "total": 1,
+                    f"by_status.{application['status']}": 1,
+                    f"score_histogram.{score_bin(application['scores'])}": 1
+                },
+                "$push": {"top": {"$each": [top_candidate(application)], "$sort": {"overall_match": -1}, "$slice": DASHBOARD_TOP_N}},
+                "$set": {"updated_at": datetime.now()}
+            }
+        )
+        if not result.matched_count:
+            rebuild_job_stats(application["job_id"])
+    except Exception as e:
+        logger.warning(f"Could not update stats for job {application['job_id']}: {str(e)}")
+
+def record_status_change(job_id, application_id, old_status, new_status):
+    """Move one application between status counters (and update it if it is a top candidate)."""
+    if old_status == new_status:
+        return
+    try:
+        result = mongo.db.job_stats.update_one(
+            {"_id": job_id},
+            {"$inc": {f"by_status.{old_status}": -1, f"by_status.{new_status}": 1}, "$set": {"updated_at": datetime.now()}}
+        )
+        if not result.matched_count:
+            rebuild_job_stats(job_id)
+            return
+        mongo.db.job_stats.update_one({"_id": job_id, "top.application_id": application_id}, {"$set": {"top.$.status": new_status}})
+    except Exception as e:
+        logger.warning(f"Could not update stats for job {job_id}: {str(e)}")
+
+def record_deleted_applications(job_id, applications):
+    """Remove deleted applications from a job's counters and refill its top candidates."""
+    if not applications:
+        return
+    decrements = Counter({"total": -len(applications)})
+    for application in applications:
+        decrements[f"by_status.{application['status']}"] -= 1
+        decrements[f"score_histogram.{score_bin(application.get('scores'))}"] -= 1
+    try:
+        result = mongo.db.job_stats.update_one({"_id": job_id}, {"$inc": dict(decrements), "$set": {"updated_at": datetime.now()}})
+        if not result.matched_count:
+            rebuild_job_stats(job_id)
+            return
+        refill_top_candidates(job_id)
+    except Exception as e:
+        logger.warning(f"Could not update stats for job {job_id}: {str(e)}")
+
+def refill_top_candidates(job_id):
+    """Recompute a job's top candidates with the (job_id, overall_match) index."""
+    top = [
+        top_candidate(application)
+        for application in mongo.db.applications.find({"job_id": job_id}, TOP_CANDIDATE_PROJECTION).sort(APPLICATION_LIST_SORT).limit(DASHBOARD_TOP_N)
+    ]
+    mongo.db.job_stats.update_one({"_id": job_id}, {"$set": {"top": top}})
+
+def rebuild_job_stats(job_id):
+    """Recount a job's stats from its applications, after a rescore or to repair drift."""
+    by_status = Counter()
+    histogram = Counter()
+    for application in mongo.db.applications.find({"job_id": job_id}, {"status": 1, "scores.overall_match": 1}):
+        by_status[application["status"]] += 1
+        histogram[score_bin(application.get("scores"))] += 1
+    mongo.db.job_stats.replace_one(
+        {"_id": job_id},
+        {
+            "total": sum(by_status.values()),
+            "by_status": dict(by_status),
+            "score_histogram": dict(histogram),
+            "top": [],
+            "updated_at": datetime.now()
+        },
+        upsert=True
+    )
+    refill_top_candidates(job_id)
+
+def serialize_job_stats(job, stats, emails):
+    stats = stats or {}
+    histogram = stats.get("score_histogram", {})
+    return {
+        "job_id": str(job["_id"]),
+        "name": job.get("name", ""),
+        "position": job.get("position", ""),
+        "total": stats.get("total", 0),
+        "by_status": {status: count for status, count in stats.get("by_status", {}).items() if count},
+        "score_histogram": [histogram.get(str(i), 0) for i in range(SCORE_HISTOGRAM_BINS)],
+        "top_candidates": [
+            {
+                "application_id": str(candidate["application_id"]),
+                "user": {"id": str(candidate["user_id"]), "email": emails.get(candidate["user_id"])},
+                "overall_match": candidate["overall_match"],
+                "status": candidate["status"]
+            } for candidate in stats.get("top", [])
+        ]
+    }
+
+class TaskError(Exception):
+    """A task failure that retrying cannot fix."""
+
+TASK_MAX_ATTEMPTS = int(os.getenv("TASK_MAX_ATTEMPTS", "3"))
+TASK_RETRY_DELAY = float(os.getenv("TASK_RETRY_DELAY", "2"))
+# Payloads and retry timers live only in the worker that queued the task, so a
+# task not updated within this lease is treated as lost with its worker. A
+# running task refreshes updated_at every TASK_HEARTBEAT_SECONDS.
+TASK_LEASE_SECONDS = float(
+    os.getenv("TASK_LEASE_SECONDS") or llm_executor.timeout * TASK_MAX_ATTEMPTS + TASK_RETRY_DELAY * 2 ** TASK_MAX_ATTEMPTS + 60
+)
+TASK_HEARTBEAT_SECONDS = max(TASK_LEASE_SECONDS / 4, 0.05)
+
+task_pool = ThreadPoolExecutor(max_workers=int(os.getenv("TASK_WORKERS", "4")), thread_name_prefix="task")
+task_handlers = {}
+
+def task_handler(kind):
+    """Register ``fn(payload, task_id) -> result`` as the handler for tasks of ``kind``."""
+    def decorator(fn):
+        task_handlers[kind] = fn
+        return fn
+    return decorator
+
+def run_task(task_id, kind, payload, run_token):
+    """Run one attempt of a task and record the outcome on its ``tasks`` document.
+
+    The attempt only runs if it can claim the task: still queued or retrying
+    and still owned by ``run_token``, which queue_task replaces when it
+    restarts a lost task. TaskError fails the task immediately; any other
+    exception is retried with exponential backoff until TASK_MAX_ATTEMPTS
+    attempts have been made.
+    """
+    owned = {"_id": task_id, "run_token": run_token}
+    task = mongo.db.tasks.find_one_and_update(
+        {**owned, "status": {"$in": ["queued", "retrying"]}},
+        {"$set": {"status": "running", "updated_at": datetime.now()}, "$inc": {"attempts": 1}},
+        return_document=ReturnDocument.AFTER
+    )
+    if not task:
+        logger.info(f"Task {task_id} ({kind}) was claimed or restarted elsewhere, skipping")
+        return
+
+    stop_heartbeat = threading.Event()
+
+    def heartbeat():
+        while not stop_heartbeat.wait(TASK_HEARTBEAT_SECONDS):
+            try:
+                mongo.db.tasks.update_one({**owned, "status": "running"}, {"$set": {"updated_at": datetime.now()}})
+            except Exception as e:
+                logger.warning(f"Could not refresh task {task_id}: {str(e)}")
+
+    threading.Thread(target=heartbeat, name=f"task-heartbeat-{task_id}", daemon=True).start()
+    try:
+        result = task_handlers[kind](payload, task_id)
+        mongo.db.tasks.update_one(owned, {"$set": {"status": "done", "result": result, "error": None, "updated_at": datetime.now()}})
+    except Exception as e:
+        retry = not isinstance(e, TaskError) and task["attempts"] < TASK_MAX_ATTEMPTS
+        logger.warning(f"Task {task_id} ({kind}) attempt {task['attempts']} failed: {str(e)}")
+        mongo.db.tasks.update_one(owned, {"$set": {
+            "status": "retrying" if retry else "failed",
+            "error": str(e) if isinstance(e, TaskError) else "Processing failed",
+            "updated_at": datetime.now()
+        }})
+        if retry:
+            timer = threading.Timer(
+                TASK_RETRY_DELAY * 2 ** (task["attempts"] - 1), task_pool.submit,
+                args=(run_task, task_id, kind, payload, run_token)
+            )
+            timer.daemon = True
+            timer.start()
+    finally:
+        stop_heartbeat.set()
+
+def serialize_task(task):
+    return {
+        "task_id": str(task["_id"]),
+        "kind": task["kind"],
+        "status": task["status"],
+        "attempts": task.get("attempts", 0),
+        "result": task.get("result"),
+        "error": task.get("error"),
+        "created_at": task["created_at"].isoformat(),
+        "updated_at": task["updated_at"].isoformat()
+    }
+
+def wants_async():
+    """Whether the client asked for the work to be queued (?async=1)."""
+    return request.args.get('async', '').lower() in ('1', 'true', 'yes')
+
+def queue_task(kind, payload, key_parts):
+    """Queue a task for the current user and answer 202 with its id.
+
+    The idempotency key comes from the Idempotency-Key header, or else from
+    ``key_parts`` (e.g. the job id and resume hash). Re-submitting a key that
+    is queued, running or done returns the existing task instead of
+    processing the upload again. A failed task, or one whose last update is
+    older than TASK_LEASE_SECONDS (its worker restarted), is restarted with
+    the new upload under a new run token, so a stale submission of the old
+    upload can no longer claim it.
+    """
+    user_id = get_jwt_identity()
+    key = request.headers.get("Idempotency-Key") or hashlib.sha256(json.dumps([kind, *key_parts]).encode()).hexdigest()
+    now = datetime.now()
+    task = {
+        "_id": ObjectId(),
+        "kind": kind,
+        "user_id": ObjectId(user_id),
+        "idempotency_key": key,
+        "status": "queued",
+        "attempts": 0,
+        "run_token": ObjectId(),
+        "created_at": now,
+        "updated_at": now
+    }
+    try:
+        mongo.db.tasks.insert_one(task)
+    except DuplicateKeyError:
+        task = mongo.db.tasks.find_one_and_update(
+            {"user_id": ObjectId(user_id), "idempotency_key": key, "$or": [
+                {"status": "failed"},
+                {"status": {"$ne": "done"}, "updated_at": {"$lt": now - timedelta(seconds=TASK_LEASE_SECONDS)}}
+            ]},
+            {"$set": {"status": "queued", "attempts": 0, "error": None, "run_token": ObjectId(), "updated_at": now}},
+            return_document=ReturnDocument.AFTER
+        )
+        if not task:
+            task = mongo.db.tasks.find_one({"user_id": ObjectId(user_id), "idempotency_key": key})
+            return jsonify(serialize_task(task)), 200, {"Location": f"/api/tasks/{task['_id']}"}
+
+    task_pool.submit(run_task, task["_id"], kind, payload, task["run_token"])
+    return jsonify(serialize_task(task)), 202, {"Location": f"/api/tasks/{task['_id']}"}
+
+@task_handler("apply")
+def apply_task(payload, task_id):
+    resume = load_resume(io.BytesIO(payload['content']), payload['file_type'])
+    if not resume:
+        raise TaskError('Could not extract resume text')
+    job = mongo.db.companies.find_one({"_id": ObjectId(payload['job_id'])})
+    if not job:
+        raise TaskError('Job not found')
+    return {'application_id': str(create_application(payload['user_id'], job, resume, task_id))}
+
+@task_handler("analyze")
+def analyze_task(payload, task_id):
+    resume = load_resume(io.BytesIO(payload['content']), payload['file_type'])
+    if not resume:
+        raise TaskError('Could not extract resume text')
+    if payload['action'] == 'improve':
+        items = re.findall(r'\d+\.\s*(.+)', try_text_generation(resume_improvements_prompt(resume['text'])))
+        if not items:
+            raise Exception('Failed to generate valid improvements')
+        return {'improvements': items[:5]}
+    items = re.findall(r'\d+\.\s*(.+)', try_text_generation(interview_questions_prompt(resume['text'])))
+    if not items:
+        raise Exception('Failed to generate interview questions')
+    return {'questions': items[:5]}
+
+user_cache = LRUCache(
+    max_bytes=int(os.getenv("USER_CACHE_MAX_BYTES", str(4 * 1024 * 1024))),
+    sizeof=lambda user: 512,
+    ttl=int(os.getenv("USER_CACHE_TTL", "60"))
+)
+
+def get_cached_user(user_id):
+    """Fetch a user (without the password hash), served from a short-TTL cache."""
+    user = user_cache.get(user_id)
+    if user is None:
+        user = mongo.db.users.find_one({"_id": ObjectId(user_id)}, {"password": 0})
+        if user:
+            user_cache.set(user_id, user)
+    return user
+
+def user_required(roles=None, message="Unauthorized"):
+    """Load the JWT's user into ``g.user``, optionally restricting it to ``roles``.
+
+    Without ``roles`` a missing user is a 404; with ``roles`` a missing user or
+    one with another role gets a 403 carrying ``message``. Must be applied
+    below ``@jwt_required()``.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            user = get_cached_user(get_jwt_identity())
+            if roles is None and not user:
+                return jsonify({"error": "User not found"}), 404
+            if roles is not None and (not user or user.get("role") not in roles):
+                return jsonify({"error": message}), 403
+            g.user = user
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# HTTP response caching for the read-heavy listing endpoints. Write routes
+# bump a version counter per data scope in the cache_versions collection, so
+# every worker sees the change; a read costs one lookup by _id, and the
+# serialized (and compressed) body is reused while the version is unchanged.
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+
+response_cache = LRUCache(
+    max_bytes=RESPONSE_CACHE_MAX_BYTES,
+    sizeof=lambda entry: len(entry['body']) * 2
+)
+
+def bump_data_version(*scopes):
+    """Invalidate cached responses for ``scopes`` (e.g. "companies", "applications:<job_id>").
+
+    Returns the new version of each scope that was bumped.
+    """
+    versions = {}
+    try:
+        for scope in scopes:
+            doc = mongo.db.cache_versions.find_one_and_update(
+                {"_id": scope},
+                {"$inc": {"version": 1}, "$set": {"updated_at": datetime.now(timezone.utc)}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            versions[scope] = doc["version"]
+    except Exception as e:
+        logger.warning(f"Could not bump cache version of {scopes}: {str(e)}")
+    return versions
+
+def record_company_change(company_id, *scopes):
+    """Bump the "companies" version (and ``scopes``) and log which job the new version changed.
+
+    Returns the new "companies" version, or None if it could not be bumped.
+    """
+    version = bump_data_version("companies", *scopes).get("companies")
+    if version is not None:
+        try:
+            mongo.db.company_changes.insert_one({"_id": version, "job_id": ObjectId(company_id), "created_at": datetime.now()})
+        except Exception as e:
+            logger.warning(f"Could not log change {version} of company {company_id}: {str(e)}")
+    return version
+
+def company_changes_between(after, upto):
+    """Job ids changed by "companies" versions after..upto, or None if any version is not logged."""
+    changes = list(mongo.db.company_changes.find({"_id": {"$gt": after, "$lte": upto}}))
+    if len(changes) != upto - after:
+        return None
+    return [change["job_id"] for change in changes]
+
+def get_data_version(scope):
+    """Return (version, last modified) for ``scope``; (0, None) if it was never written."""
+    doc = mongo.db.cache_versions.find_one({"_id": scope})
+    return (doc["version"], doc.get("updated_at")) if doc else (0, None)
+
+def choose_encoding(entry):
+    """Return the best content encoding the client accepts for the cached body, or None."""
+    if len(entry['body']) < COMPRESS_MIN_BYTES:
+        return None
+    if 'br' in request.accept_encodings:
+        try:
+            import brotli  # noqa: F401
+            return 'br'
+        except ImportError:
+            pass
+    if 'gzip' in request.accept_encodings:
+        return 'gzip'
+    return None
+
+def compress_body(entry, encoding):
+    """Return the cached body in ``encoding``, memoized on the entry."""
+    if encoding is None:
+        return entry['body']
+    encoded = entry['encoded'].get(encoding)
+    if encoded is None:
+        if encoding == 'br':
+            import brotli
+            encoded = brotli.compress(entry['body'], quality=5)
+        else:
+            encoded = gzip.compress(entry['body'], compresslevel=6)
+        entry['encoded'][encoding] = encoded
+    return encoded
+
+def conditional_json(key, build, scope=None):
+    """Serve ``build()`` as JSON with ETag/Last-Modified, answering 304 when the client copy is current.
+
+    ``key`` identifies the response variant (endpoint, caller, query). With a
+    ``scope`` the serialized body is cached until that scope's version is
+    bumped; without one the ETag is a hash of the body, which only saves
+    bandwidth.
+    """
+    version, last_modified = get_data_version(scope) if scope else (None, None)
+    cache_key = (key, version) if scope else None
+    entry = response_cache.get(cache_key) if scope else None
+    if entry is None:
+        body = app.json.dumps(build()).encode()
+        entry = {
+            'body': body,
+            'etag': hashlib.sha1(repr(cache_key).encode() if scope else body).hexdigest(),
+            'last_modified': last_modified,
+            'encoded': {}
+        }
+        if scope:
+            response_cache.set(cache_key, entry)
+
+    # Each encoding is a different representation, so it gets its own strong ETag
+    encoding = choose_encoding(entry)
+    response = Response(mimetype="application/json")
+    response.set_etag(f"{entry['etag']}-{encoding}" if encoding else entry['etag'])
+    if entry['last_modified']:
+        response.last_modified = entry['last_modified'].replace(tzinfo=timezone.utc)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    response.vary.add("Accept-Encoding")
+    response.make_conditional(request)
+    if response.status_code == 304:
+        return response
+
+    response.set_data(compress_body(entry, encoding))
+    if encoding:
+        response.content_encoding = encoding
+    return response
+
 # Routes
 
+@app.errorhandler(LLMOverloadedError)
+def llm_overloaded(e):
+    return jsonify({'error': 'The AI service is busy, please try again shortly'}), 503, {'Retry-After': '5'}
+
 @app.route("/api/signup", methods=["POST"])
 def signup():
     with app.app_context():
@@ -191,12 +2407,15 @@ def signup():
             return jsonify({"error": "Invalid HR code"}), 400
 
         hashed_password = generate_password_hash(password)
-        user_id = mongo.db.users.insert_one({
-            "email": email,
-            "password": hashed_password,
-            "role": role,
-            "hr_code": hr_code
-        }).inserted_id
+        try:
+            user_id = mongo.db.users.insert_one({
+                "email": email,
+                "password": hashed_password,
+                "role": role,
+                "hr_code": hr_code
+            }).inserted_id
+        except DuplicateKeyError:
+            return jsonify({"error": "Email already exists"}), 400
 
         token = create_access_token(identity=str(user_id))
         return jsonify({"token": token, "user": {"id": str(user_id), "email": email, "role": role}}), 201
@@ -216,50 +2435,70 @@ def login():
 
 @app.route("/api/user", methods=["GET"])
 @jwt_required()
+@user_required()
 def get_user():
-    user_id = get_jwt_identity()
-    user = mongo.db.users.find_one({"_id": ObjectId(user_id)})
-    if not user:
-        return jsonify({"error": "User not found"}), 404
-    return jsonify({"id": str(user["_id"]), "email": user["email"], "role": user["role"]}), 200
+    user = g.user
+    return conditional_json(("user", str(user["_id"])), lambda: {"id": str(user["_id"]), "email": user["email"], "role": user["role"]})
 
 @app.route("/api/companies", methods=["GET", "POST"])
 @jwt_required()
+@user_required()
 def companies():
-    user_id = get_jwt_identity()
-    user = mongo.db.users.find_one({"_id": ObjectId(user_id)})
-    if not user:
-        return jsonify({"error": "User not found"}), 404
+    user = g.user
 
     if request.method == "GET":
         query = {"hr_code": user["hr_code"]} if user["role"] == "hr" else {}
-        companies = list(mongo.db.companies.find(query))
-        return jsonify([{**c, "_id": str(c["_id"])} for c in companies])
+        return conditional_json(
+            ("companies", query.get("hr_code")),
+            lambda: [{**c, "_id": str(c["_id"])} for c in mongo.db.companies.find(query)],
+            scope="companies"
+        )
 
     if user["role"] != "tpo":
         return jsonify({"error": "Unauthorized"}), 403
     data = request.json
     data["hr_code"] = str(ObjectId())
+    data.update(job_skill_fields(data))
     company_id = mongo.db.companies.insert_one(data).inserted_id
+    job_index.upsert(data, record_company_change(company_id))
     return jsonify({"id": str(company_id), "hr_code": data["hr_code"]}), 201
 
 @app.route("/api/companies/<company_id>", methods=["PUT", "DELETE"])
 @jwt_required()
+@user_required(roles=["tpo"])
 def manage_company(company_id):
-    user_id = get_jwt_identity()
-    user = mongo.db.users.find_one({"_id": ObjectId(user_id)})
-    if not user or user["role"] != "tpo":
-        return jsonify({"error": "Unauthorized"}), 403
-
     if request.method == "PUT":
         data = request.json
-        result = mongo.db.companies.update_one(
+        for field in ("score_version", "skills", "skills_version"):
+            data.pop(field, None)
+        current = mongo.db.companies.find_one(
             {"_id": ObjectId(company_id)},
-            {"$set": data}
+            {field: 1 for field in (*JOB_TEXT_FIELDS, "skills_version")}
         )
-        return jsonify({"message": "Company updated" if result.matched_count else "Company not found"}), 200 if result.matched_count else 404
+        if not current:
+            return jsonify({"message": "Company not found"}), 404
+
+        update = {"$set": data}
+        text_changed = any(field in data and data[field] != current.get(field) for field in JOB_TEXT_FIELDS)
+        if text_changed:
+            update["$inc"] = {"score_version": 1}
+        if text_changed or current.get("skills_version") != skill_matcher.version:
+            data.update(job_skill_fields({**current, **data}))
+        job = mongo.db.companies.find_one_and_update({"_id": ObjectId(company_id)}, update, return_document=ReturnDocument.AFTER)
+        if not job:
+            return jsonify({"message": "Company not found"}), 404
+
+        # Listings report score_fresh against the job's score_version
+        version = record_company_change(company_id, *([f"applications:{company_id}"] if text_changed else []))
+        job_index.upsert(job, version)
+        if text_changed:
+            schedule_rescore(company_id, job["score_version"])
+        return jsonify({"message": "Company updated", "rescoring": text_changed}), 200
 
     result = mongo.db.companies.delete_one({"_id": ObjectId(company_id)})
+    if result.deleted_count:
+        mongo.db.job_stats.delete_one({"_id": ObjectId(company_id)})
+        job_index.remove(company_id, record_company_change(company_id, f"applications:{company_id}"))
     return jsonify({"message": "Company deleted" if result.deleted_count else "Company not found"}), 200 if result.deleted_count else 404
 
 @app.route("/api/jobs/recommendations", methods=["POST", "OPTIONS"])
@@ -280,42 +2519,33 @@ def job_recommendations():
         if file_ext not in ['pdf', 'docx']:
             return jsonify({'error': 'Invalid file type. Only PDF and DOCX allowed'}), 400
 
-        resume_text = extract_text_from_file(resume_file, file_ext)
-        if not resume_text:
+        resume = load_resume(resume_file, file_ext)
+        if not resume:
             return jsonify({'error': 'Could not extract resume text'}), 400
 
-        jobs = list(mongo.db.companies.find({}))
-        if not jobs:
+        job_index.ensure_loaded(mongo.db.companies)
+        if not job_index.job_count:
             return jsonify({'jobs': [], 'message': 'No jobs available'}), 200
 
-        recommended_jobs = []
-        for job in jobs:
-            logger.info(f"Job data: {job}")
-            job_text = ' '.join(filter(None, [job.get('position', ''), job.get('description', ''), job.get('requirements', '')]))
-            if not job_text.strip():
-                continue
-
-            scores = calculate_matching_scores(resume_text, job_text)
-            if scores['overall_match'] > 30:
-                recommended_jobs.append({
-                    'id': str(job['_id']),
-                    'name': job.get('name', ''),
-                    'position': job.get('position', ''),
-                    'description': job.get('description', ''),
-                    'requirements': job.get('requirements', ''),
-                    'location': job.get('location', ''),
-                    'salary_min': job.get('salary_min', ''),
-                    'salary_max': job.get('salary_max', ''),
-                    'match_details': {
-                        'overall_match': scores['overall_match'] / 100,
-                        'technical_match': scores['technical_match'] / 100,
-                        'tfidf_similarity': scores['tfidf_similarity'] / 100,
-                        'bm25_score': scores['bm25_score'] / 100
-                    }
-                })
-
-        recommended_jobs.sort(key=lambda x: x['match_details']['overall_match'], reverse=True)
-        return jsonify({'jobs': recommended_jobs[:5]}), 200
+        recommended_jobs = [
+            {
+                'id': str(job['_id']),
+                'name': job.get('name', ''),
+                'position': job.get('position', ''),
+                'description': job.get('description', ''),
+                'requirements': job.get('requirements', ''),
+                'location': job.get('location', ''),
+                'salary_min': job.get('salary_min', ''),
+                'salary_max': job.get('salary_max', ''),
+                'match_details': {
+                    'overall_match': scores['overall_match'] / 100,
+                    'technical_match': scores['technical_match'] / 100,
+                    'tfidf_similarity': scores['tfidf_similarity'] / 100,
+                    'bm25_score': scores['bm25_score'] / 100
+                }
+            } for job, scores in job_index.top_k(resume['text'], k=5, min_score=30, features=resume)
+        ]
+        return jsonify({'jobs': recommended_jobs}), 200
 
     except Exception as e:
         logger.error(f"Recommendation error: {str(e)}")
@@ -336,25 +2566,37 @@ def analyze_resume():
         return jsonify({'error': 'Invalid file type'}), 400
 
     file_ext = resume_file.filename.rsplit('.', 1)[1].lower()
-    resume_text = extract_text_from_file(resume_file, file_ext)
-    if not resume_text:
+    if wants_async():
+        if action not in ('improve', 'questions'):
+            return jsonify({'error': 'Invalid action'}), 400
+        content = resume_file.read()
+        return queue_task('analyze', {'content': content, 'file_type': file_ext, 'action': action},
+                          [action, resume_hash(content, file_ext)])
+
+    resume = load_resume(resume_file, file_ext)
+    if not resume:
         return jsonify({'error': 'Could not extract resume text'}), 400
+    resume_text = resume['text']
 
     if action == 'improve':
-        prompt = f"""Based on this resume:
-{resume_text}
-Provide exactly 5 specific, professional suggestions to improve the resume. Focus on clarity, relevance, and impact. Output the suggestions in a numbered list, starting with '1. ', '2. ', etc., one suggestion per line. Each suggestion should be concise and actionable."""
+        prompt = resume_improvements_prompt(resume_text)
+        if wants_stream():
+            return stream_numbered_items(prompt, 'Failed to generate valid improvements')
         try:
             response = try_text_generation(prompt)
             improvements = re.findall(r'\d+\.\s*(.+)', response)
             if not improvements:
                 return jsonify({'error': 'Failed to generate valid improvements'}), 500
             return jsonify({'improvements': improvements[:5]})
+        except LLMOverloadedError:
+            raise
         except Exception as e:
             logger.error(f"Resume improvement error: {str(e)}")
             return jsonify({'error': 'Failed to analyze resume'}), 500
 
     elif action == 'questions':
+        if wants_stream():
+            return stream_numbered_items(interview_questions_prompt(resume_text), 'Failed to generate interview questions')
         questions = generate_interview_questions(resume_text)
         return jsonify({'questions': questions})
 
@@ -385,12 +2627,16 @@ Provide constructive feedback and suggestions for improvement in a numbered list
 4. Suggestions for better articulation or presentation
 Ensure feedback is clear, concise, and specific."""
 
+        if wants_stream():
+            return stream_numbered_items(prompt, 'Failed to generate valid feedback')
         try:
             response = try_text_generation(prompt)
             feedback = re.findall(r'\d+\.\s*(.+)', response)
             if not feedback:
                 return jsonify({'error': 'Failed to generate valid feedback'}), 500
             return jsonify({'result': feedback[:5]})
+        except LLMOverloadedError:
+            raise
         except Exception as e:
             logger.error(f"Error calling Groq API: {str(e)}")
             return jsonify({'error': 'An error occurred during interview preparation'}), 500
@@ -409,84 +2655,224 @@ def apply_for_job(job_id):
         return jsonify({'error': 'Invalid file type'}), 400
 
     file_ext = resume_file.filename.rsplit('.', 1)[1].lower()
-    resume_text = extract_text_from_file(resume_file, file_ext)
-    if not resume_text:
+    if wants_async():
+        if not mongo.db.companies.find_one({"_id": ObjectId(job_id)}, {"_id": 1}):
+            return jsonify({'error': 'Job not found'}), 404
+        content = resume_file.read()
+        return queue_task('apply', {'user_id': user_id, 'job_id': job_id, 'content': content, 'file_type': file_ext},
+                          [job_id, resume_hash(content, file_ext)])
+
+    resume = load_resume(resume_file, file_ext)
+    if not resume:
         return jsonify({'error': 'Could not extract resume text'}), 400
 
     job = mongo.db.companies.find_one({"_id": ObjectId(job_id)})
     if not job:
         return jsonify({'error': 'Job not found'}), 404
 
-    job_text = ' '.join(filter(None, [job.get('position', ''), job.get('description', ''), job.get('requirements', '')]))
-    scores = calculate_matching_scores(resume_text, job_text)
+    create_application(user_id, job, resume)
+    return jsonify({'message': 'Application submitted'}), 201
 
-    mongo.db.applications.insert_one({
-        'user_id': ObjectId(user_id),
-        'job_id': ObjectId(job_id),
-        'resume_text': resume_text,
-        'scores': scores,
-        'status': 'pending',
-        'applied_at': datetime.now()
-    })
+@app.route("/api/jobs/<job_id>/screen", methods=["POST"])
+@jwt_required()
+@user_required(roles=["tpo", "hr"])
+def screen_resumes(job_id):
+    """Rank a batch of resumes against one job.
+
+    Resumes come from multipart 'resumes' files (PDF, DOCX or zip archives);
+    without files, every stored application for the job is re-screened. With
+    ?stream=1 the response is a Server-Sent Events stream of 'progress' events
+    followed by a single 'result' event.
+    """
+    job = mongo.db.companies.find_one({"_id": ObjectId(job_id)})
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    job_index.ensure_loaded(mongo.db.companies)
+    job_index.ensure_job(job)
+    if not build_job_text(job).strip():
+        return jsonify({'error': 'Job has no description to screen against'}), 400
 
-    return jsonify({'message': 'Application submitted'}), 201
+    if request.files:
+        try:
+            uploads = collect_batch_uploads()
+        except (ValueError, zipfile.BadZipFile) as e:
+            return jsonify({'error': str(e)}), 400
+        if not uploads:
+            return jsonify({'error': 'No PDF or DOCX resumes provided'}), 400
+        candidates = [{'filename': filename} for filename, _, _ in uploads]
+        loader = iter_load_resumes([(content, file_type) for _, content, file_type in uploads])
+    else:
+        applications = list(mongo.db.applications.find(
+            {"job_id": ObjectId(job_id)},
+            {"user_id": 1, "status": 1, **APPLICATION_RESUME_PROJECTION}
+        ))
+        texts = load_resume_texts(applications)
+        candidates = [
+            {'application_id': str(a['_id']), 'user_id': str(a['user_id']), 'status': a.get('status')}
+            for a in applications
+        ]
+        loader = (
+            (position, resume_features(texts[a['_id']], stored_resume_skills(a)) if a['_id'] in texts else None)
+            for position, a in enumerate(applications)
+        )
+
+    features = [None] * len(candidates)
+    if not wants_stream():
+        for position, resume in loader:
+            features[position] = resume
+        return jsonify(rank_screened_resumes(job_id, candidates, features)), 200
+
+    def generate():
+        try:
+            for done, (position, resume) in enumerate(loader, 1):
+                features[position] = resume
+                yield sse_event('progress', {'done': done, 'total': len(candidates)})
+            yield sse_event('result', rank_screened_resumes(job_id, candidates, features))
+        except Exception as e:
+            logger.error(f"Batch screening error: {str(e)}")
+            yield sse_event('error', {'error': 'Failed to screen resumes'})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
 @app.route("/api/jobs/<job_id>/applications", methods=["GET"])
 @jwt_required()
+@user_required(roles=["tpo", "hr"])
 def get_job_applications(job_id):
-    user_id = get_jwt_identity()
-    user = mongo.db.users.find_one({"_id": ObjectId(user_id)})
-    if not user or user["role"] not in ["tpo", "hr"]:
-        return jsonify({"error": "Unauthorized"}), 403
-
-    applications = list(mongo.db.applications.find({"job_id": ObjectId(job_id)}))
-    enriched_applications = [
-        {
-            "id": str(app["_id"]),
-            "user": {
-                "id": str(app["user_id"]),
-                "email": mongo.db.users.find_one({"_id": app["user_id"]})["email"]
-            },
-            "scores": app["scores"],
-            "status": app["status"],
-            "applied_at": app["applied_at"].isoformat()
-        } for app in applications
-    ]
+    """List a job's applications, best overall match first.
 
-    enriched_applications.sort(key=lambda x: x["scores"]["overall_match"], reverse=True)
-    return jsonify({"applications": enriched_applications, "total": len(enriched_applications)})
+    Optional ?limit=N returns one page plus a ``next_cursor`` to pass back as
+    ?after=... for the following page; without it every application is
+    returned, as before.
+    """
+    try:
+        limit = int(request.args["limit"]) if "limit" in request.args else None
+        after = decode_applications_cursor(request.args["after"]) if "after" in request.args else None
+    except (ValueError, TypeError, InvalidId):
+        return jsonify({"error": "Invalid limit or cursor"}), 400
+    if limit is not None and not 1 <= limit <= MAX_APPLICATIONS_PAGE:
+        return jsonify({"error": f"limit must be between 1 and {MAX_APPLICATIONS_PAGE}"}), 400
+
+    job_oid = ObjectId(job_id)
+    job = mongo.db.companies.find_one({"_id": job_oid}, {"score_version": 1})
+    job_version = job.get("score_version", 0) if job else 0
+    if job_version and mongo.db.applications.find_one(
+        {"job_id": job_oid, "$or": [{"score_version": {"$lt": job_version}}, {"score_version": {"$exists": False}}]},
+        {"_id": 1}
+    ):
+        schedule_rescore(job_id, job_version)
+
+    def build():
+        query = {"job_id": job_oid}
+        if after:
+            score, last_id = after
+            query["$or"] = [
+                {"scores.overall_match": {"$lt": score}},
+                {"scores.overall_match": score, "_id": {"$lt": last_id}}
+            ]
+        cursor = mongo.db.applications.find(query, APPLICATION_LIST_PROJECTION).sort(APPLICATION_LIST_SORT)
+        if limit:
+            cursor = cursor.limit(limit)
+        applications = list(cursor)
+
+        user_ids = list({app["user_id"] for app in applications})
+        emails = {user["_id"]: user.get("email") for user in mongo.db.users.find({"_id": {"$in": user_ids}}, {"email": 1})}
+        enriched_applications = [
+            {
+                "id": str(app["_id"]),
+                "user": {
+                    "id": str(app["user_id"]),
+                    "email": emails.get(app["user_id"])
+                },
+                "scores": app["scores"],
+                "score_fresh": app.get("score_version", 0) >= job_version,
+                "status": app["status"],
+                "applied_at": app["applied_at"].isoformat()
+            } for app in applications
+        ]
+
+        response = {"applications": enriched_applications, "total": mongo.db.applications.count_documents({"job_id": job_oid})}
+        if limit and len(applications) == limit:
+            response["next_cursor"] = encode_applications_cursor(applications[-1])
+        return response
+
+    return conditional_json(("applications", job_id, limit, request.args.get("after")), build, scope=f"applications:{job_id}")
+
+@app.route("/api/dashboard", methods=["GET"])
+@jwt_required()
+@user_required(roles=["tpo", "hr"])
+def dashboard():
+    """Per-job and per-company application stats for the HR/TPO dashboards, read from job_stats."""
+    user = g.user
+    query = {"hr_code": user.get("hr_code")} if user["role"] == "hr" else {}
+    jobs = list(mongo.db.companies.find(query, {"name": 1, "position": 1}))
+    stats = {doc["_id"]: doc for doc in mongo.db.job_stats.find({"_id": {"$in": [job["_id"] for job in jobs]}})}
+    missing = [job["_id"] for job in jobs if job["_id"] not in stats]
+    if missing:
+        for job_id in missing:
+            rebuild_job_stats(job_id)
+        stats.update((doc["_id"], doc) for doc in mongo.db.job_stats.find({"_id": {"$in": missing}}))
+
+    user_ids = list({candidate["user_id"] for doc in stats.values() for candidate in doc.get("top", [])})
+    emails = {u["_id"]: u.get("email") for u in mongo.db.users.find({"_id": {"$in": user_ids}}, {"email": 1})} if user_ids else {}
+    job_stats = [serialize_job_stats(job, stats.get(job["_id"]), emails) for job in jobs]
+
+    companies = OrderedDict()
+    for job in job_stats:
+        company = companies.setdefault(job["name"], {"name": job["name"], "jobs": 0, "total": 0, "by_status": Counter()})
+        company["jobs"] += 1
+        company["total"] += job["total"]
+        company["by_status"].update(job["by_status"])
+    totals = Counter()
+    for company in companies.values():
+        totals.update(company["by_status"])
+
+    return jsonify({
+        "jobs": job_stats,
+        "companies": [dict(company, by_status=dict(company["by_status"])) for company in companies.values()],
+        "totals": {"jobs": len(job_stats), "applications": sum(job["total"] for job in job_stats), "by_status": dict(totals)}
+    }), 200
+
+@app.route("/api/tasks/<task_id>", methods=["GET"])
+@jwt_required()
+def get_task(task_id):
+    """Poll a queued task's status and, once done, its result."""
+    task = mongo.db.tasks.find_one({"_id": ObjectId(task_id), "user_id": ObjectId(get_jwt_identity())})
+    if not task:
+        return jsonify({"error": "Task not found"}), 404
+    return jsonify(serialize_task(task)), 200
 
 @app.route("/api/applications/<application_id>/status", methods=["PATCH"])
 @jwt_required()
+@user_required(roles=["tpo", "hr"])
 def update_application_status(application_id):
-    user_id = get_jwt_identity()
-    user = mongo.db.users.find_one({"_id": ObjectId(user_id)})
-    if not user or user["role"] not in ["tpo", "hr"]:
-        return jsonify({"error": "Unauthorized"}), 403
-
     new_status = request.json.get("status")
     if not new_status:
         return jsonify({"error": "Status required"}), 400
+    if new_status not in APPLICATION_STATUSES:
+        return jsonify({"error": f"Status must be one of: {', '.join(APPLICATION_STATUSES)}"}), 400
 
-    result = mongo.db.applications.update_one(
+    previous = mongo.db.applications.find_one_and_update(
         {"_id": ObjectId(application_id)},
-        {"$set": {"status": new_status, "last_updated": datetime.now()}}
+        {"$set": {"status": new_status, "last_updated": datetime.now()}},
+        projection={"job_id": 1, "status": 1},
+        return_document=ReturnDocument.BEFORE
     )
-    return jsonify({"message": "Status updated" if result.matched_count else "Application not found"}), 200 if result.matched_count else 404
+    if previous:
+        record_status_change(previous["job_id"], previous["_id"], previous["status"], new_status)
+        bump_data_version(f"applications:{previous['job_id']}")
+    return jsonify({"message": "Status updated" if previous else "Application not found"}), 200 if previous else 404
 
 @app.route("/api/applications/rejected", methods=["DELETE"])
 @jwt_required()
+@user_required(roles=["hr"], message="Unauthorized access")
 def delete_rejected_applications():
     try:
-        # Get the HR user's identity
-        current_user_id = get_jwt_identity()
-        current_user = mongo.db.users.find_one({"_id": ObjectId(current_user_id)})
-        
-        if not current_user or current_user.get("role") != "hr":
-            return jsonify({"error": "Unauthorized access"}), 403
-            
         # Get the HR's company code
-        hr_code = current_user.get("hr_code")
+        hr_code = g.user.get("hr_code")
         if not hr_code:
             return jsonify({"error": "HR code not found"}), 400
             
@@ -495,15 +2881,76 @@ def delete_rejected_applications():
         if not company:
             return jsonify({"error": "Company not found"}), 404
             
+        rejected = list(mongo.db.applications.find(
+            {"job_id": company["_id"], "status": "rejected"},
+            {"status": 1, "scores.overall_match": 1}
+        ))
         result = mongo.db.applications.delete_many({
-            "job_id": ObjectId(str(company["_id"])),
+            "_id": {"$in": [application["_id"] for application in rejected]},
             "status": "rejected"
         })
+        if result.deleted_count == len(rejected):
+            record_deleted_applications(company["_id"], rejected)
+        else:
+            # Some applications changed status in between; recount instead of guessing
+            rebuild_job_stats(company["_id"])
+        if result.deleted_count:
+            bump_data_version(f"applications:{company['_id']}")
         
         return jsonify({"message": f"Successfully deleted {result.deleted_count} rejected applications"}), 200
     except Exception as e:
         logger.error(f"Error deleting rejected applications: {str(e)}")
         return jsonify({"error": "An error occurred while deleting rejected applications"}), 500
 
+def render_cache_metrics():
+    lines = ["# HELP gpms_cache_requests_total In-process cache lookups.", "# TYPE gpms_cache_requests_total counter"]
+    for name, cache in (("resume", resume_cache), ("llm", llm_cache), ("user", user_cache)):
+        lines.append(f'gpms_cache_requests_total{{cache="{name}",result="hit"}} {cache.hits}')
+        lines.append(f'gpms_cache_requests_total{{cache="{name}",result="miss"}} {cache.misses}')
+    lines.append('gpms_cache_requests_total{cache="llm_mongo",result="hit"} %d' % llm_cache_stats['mongo_hits'])
+    lines.append("# HELP gpms_llm_coalesced_total LLM requests answered by an identical in-flight call.")
+    lines.append("# TYPE gpms_llm_coalesced_total counter")
+    lines.append(f"gpms_llm_coalesced_total {llm_executor.coalesced}")
+    return lines
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    lines = [line for metric in METRICS for line in metric.render()] + render_cache_metrics()
+    return Response("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
+
+@app.route('/api/health/live', methods=['GET'])
+def liveness():
+    return jsonify({"status": "ok"}), 200
+
+@app.route('/api/health/ready', methods=['GET'])
+def readiness():
+    """Report whether MongoDB and the Groq API are reachable; 503 until both are."""
+    schedule_llm_health_check()
+    try:
+        mongo_ready = mongo.cx.topology_description.has_readable_server()
+    except Exception:
+        mongo_ready = False
+    ready = mongo_ready and llm_health["status"] == "ok"
+    return jsonify({
+        "ready": ready,
+        "mongo": "ok" if mongo_ready else "unavailable",
+        "llm": llm_health["status"],
+        "llm_error": llm_health["error"],
+        "startup_ms": round(STARTUP_MS),
+        "uptime_seconds": round(time.perf_counter() - STARTUP_STARTED)
+    }), 200 if ready else 503
+
+if multiprocessing.current_process().name == "MainProcess":
+    schedule_llm_health_check(force=True)
+
+    if os.getenv("PRELOAD_WARMUP") == "1":
+        warmup()
+
+STARTUP_MS = (time.perf_counter() - STARTUP_STARTED) * 1000
+if STARTUP_MS > STARTUP_BUDGET_MS:
+    logger.warning(f"App imported in {STARTUP_MS:.0f} ms, over the {STARTUP_BUDGET_MS} ms startup budget")
+else:
+    logger.info(f"App imported in {STARTUP_MS:.0f} ms")
+
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,313 @@
+"""Benchmarks for the resume extraction, scoring and recommendation hot paths.
+
+Runs entirely in-process against synthetic data: resumes are generated as
+PDF and DOCX documents, job corpora are inserted into mongomock, and the Groq
+client is replaced by a fake that answers with a fixed numbered list after an
+optional delay. Nothing touches MongoDB or the network.
+
+    python benchmark.py run --output baseline.json
+    python benchmark.py run --jobs 100,1000,10000,50000 --output current.json
+    python benchmark.py compare baseline.json current.json --threshold 0.15
+
+Every stage reports throughput, p50/p99/mean latency and the peak Python heap
+(tracemalloc) of one extra, separately traced iteration. ``compare`` exits
+non-zero when any stage's p50, p99 or peak memory grew by more than the
+threshold.
+"""
+import io
+import json
+import logging
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+import types
+from datetime import datetime
+
+import click
+import numpy as np
+
+# app.py refuses to import without these; none of them are used for real here
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017/benchmark")
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key-that-is-long-enough")
+os.environ.setdefault("GROQ_API_KEY", "benchmark")
+os.environ.setdefault("GROQ_BASE_URL", "http://127.0.0.1:9")
+
+FILLER_WORDS = (
+    "team project delivered improved designed built led managed customers reporting "
+    "quality performance analysis stakeholders release platform service users growth "
+    "process migration support documentation review planning ownership reliability"
+).split()
+LLM_ANSWER = "\n".join(f"{i}. Synthetic suggestion number {i} for this resume." for i in range(1, 6))
+
+
+class FakeLLM:
+    """Stand-in for the Groq client: same call shape, fixed answer, configurable latency."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+        self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self._create))
+        self.models = types.SimpleNamespace(list=lambda: [])
+
+    def _create(self, stream=False, **kwargs):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        usage = types.SimpleNamespace(prompt_tokens=len(kwargs["messages"][-1]["content"].split()),
+                                      completion_tokens=len(LLM_ANSWER.split()))
+        if stream:
+            return iter([
+                types.SimpleNamespace(choices=[types.SimpleNamespace(delta=types.SimpleNamespace(content=line + "\n"))])
+                for line in LLM_ANSWER.splitlines()
+            ])
+        message = types.SimpleNamespace(content=LLM_ANSWER)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)], usage=usage)
+
+
+def load_skill_names():
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "skills.json")) as f:
+        return sorted(json.load(f))
+
+
+def resume_paragraphs(rng, skills, pages, words_per_page=250):
+    """Return one paragraph of pseudo-resume text per page."""
+    return [
+        " ".join(rng.choice(skills) if rng.random() < 0.15 else rng.choice(FILLER_WORDS) for _ in range(words_per_page))
+        for _ in range(pages)
+    ]
+
+
+def make_pdf(pages):
+    """Build a minimal valid PDF with one page of Helvetica text per entry in ``pages``."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        lines = [text[i:i + 90] for i in range(0, len(text), 90)]
+        body = " T* ".join("(%s) Tj" % line.replace("\\", "").replace("(", "").replace(")", "") for line in lines)
+        stream = "BT /F1 10 Tf 12 TL 40 760 Td %s ET" % body
+        objects.append("<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append("<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       "/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects))
+        kids.append(len(objects))
+    objects[1] = "<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join("%d 0 R" % kid for kid in kids), len(kids))
+
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += ("%d 0 obj\n%s\nendobj\n" % (number, obj)).encode("latin-1")
+    xref = len(out)
+    out += ("xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)).encode()
+    out += "".join("%010d 00000 n \n" % offset for offset in offsets).encode()
+    out += ("trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)).encode()
+    return out
+
+
+def make_docx(pages):
+    from docx import Document
+    document = Document()
+    for text in pages:
+        document.add_paragraph(text)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def make_jobs(rng, skills, count):
+    """Generate ``count`` job postings spread over topic clusters of related skills."""
+    topics = [rng.sample(skills, 12) for _ in range(max(8, int(count ** 0.5)))]
+    jobs = []
+    for i in range(count):
+        topic = rng.choice(topics)
+        jobs.append({
+            "name": f"Company {i}",
+            "position": f"{rng.choice(topic).title()} Engineer",
+            "description": " ".join(rng.choice(topic) if rng.random() < 0.3 else rng.choice(FILLER_WORDS) for _ in range(80)),
+            "requirements": ", ".join(rng.sample(topic, 5)),
+            "location": "Remote",
+            "salary_min": 50000,
+            "salary_max": 90000
+        })
+    return jobs
+
+
+def measure(fn, iterations):
+    """Time ``fn(i)`` over ``iterations`` calls after one warm-up, then trace one more call for peak memory."""
+    fn(-1)
+    timings = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        call_started = time.perf_counter()
+        fn(i)
+        timings.append(time.perf_counter() - call_started)
+    total = time.perf_counter() - started
+
+    tracemalloc.start()
+    fn(iterations)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings_ms = np.array(timings) * 1000
+    return {
+        "iterations": iterations,
+        "throughput_per_s": round(iterations / total, 2),
+        "p50_ms": round(float(np.percentile(timings_ms, 50)), 3),
+        "p99_ms": round(float(np.percentile(timings_ms, 99)), 3),
+        "mean_ms": round(float(timings_ms.mean()), 3),
+        "peak_memory_kb": round(peak / 1024, 1)
+    }
+
+
+def run_benchmarks(job_sizes, page_counts, iterations, llm_latency, ann, seed):
+    import mongomock
+    import app as appmod
+
+    logging.getLogger(appmod.__name__).setLevel(logging.WARNING)
+    appmod.client = FakeLLM(latency=llm_latency)
+    appmod.mongo.db = mongomock.MongoClient().db
+    # Every iteration uses a fresh resume so the result caches only ever miss
+    appmod.use_mongo_resume_cache = False
+    appmod.use_mongo_llm_cache = False
+
+    rng = random.Random(seed)
+    skills = load_skill_names()
+    results = {}
+
+    def record(name, metrics):
+        results[name] = metrics
+        click.echo(f"{name:<45} {metrics['throughput_per_s']:>10.1f}/s  p50 {metrics['p50_ms']:>9.2f} ms  "
+                   f"p99 {metrics['p99_ms']:>9.2f} ms  peak {metrics['peak_memory_kb']:>10.1f} KiB")
+
+    for pages in page_counts:
+        documents = {
+            "pdf": make_pdf(resume_paragraphs(rng, skills, pages)),
+            "docx": make_docx(resume_paragraphs(rng, skills, pages))
+        }
+        for file_type, content in documents.items():
+            record(f"extract_{file_type}[pages={pages}]",
+                   measure(lambda i: appmod.extract_text_from_file(content, file_type), iterations))
+
+    resume_texts = [" ".join(resume_paragraphs(rng, skills, 2)) for _ in range(iterations + 2)]
+    record("resume_features", measure(lambda i: appmod.resume_features(resume_texts[i]), iterations))
+
+    # Scoring one application against its job, as apply and rescoring do
+    job = make_jobs(rng, skills, 1)[0]
+    appmod.mongo.db.companies.insert_one(job)
+    appmod.job_index.ensure_loaded(appmod.mongo.db.companies)
+    resume_feature_list = [appmod.resume_features(text) for text in resume_texts]
+    record("score_for_job", measure(lambda i: appmod.score_for_job(job, [resume_feature_list[i]]), iterations))
+
+    user_id = appmod.mongo.db.users.insert_one({"email": "student@example.com", "role": "student"}).inserted_id
+    with appmod.app.app_context():
+        token = appmod.create_access_token(identity=str(user_id))
+    headers = {"Authorization": f"Bearer {token}"}
+    client = appmod.app.test_client()
+    upload_pages = [resume_paragraphs(rng, skills, 2) for _ in range(iterations + 2)]
+
+    def upload(i, path, form=None):
+        data = dict(form or {}, resume=(io.BytesIO(make_docx(upload_pages[i])), "resume.docx"))
+        response = client.post(path, data=data, headers=headers, content_type="multipart/form-data")
+        assert response.status_code == 200, response.get_json()
+
+    appmod.resume_cache.clear()
+    record("analyze_resume[improve]", measure(lambda i: upload(i, "/api/analyze-resume", {"action": "improve"}), iterations))
+
+    for size in job_sizes:
+        appmod.mongo.db.companies.drop()
+        appmod.mongo.db.companies.insert_many(make_jobs(rng, skills, size))
+        index = appmod.JobIndex(vector_index=appmod.JobVectorIndex() if ann else None, ann_min_jobs=1000)
+        appmod.job_index = index
+        record(f"job_index_load[jobs={size}]", measure(lambda i: index.load(appmod.mongo.db.companies), 2))
+
+        features = [appmod.resume_features(text) for text in resume_texts]
+        modes = [("exhaustive", True)] + ([("ann", False)] if ann and size >= index.ann_min_jobs else [])
+        for mode, exhaustive in modes:
+            record(f"top_k[jobs={size},{mode}]", measure(
+                lambda i: index.top_k(resume_texts[i], k=5, min_score=0, features=features[i], exhaustive=exhaustive),
+                iterations))
+
+        job_id = str(next(iter(appmod.mongo.db.companies.find({}, {"_id": 1})))["_id"])
+        index.ensure_loaded(appmod.mongo.db.companies)
+        record(f"score_resumes[jobs={size},batch=50]",
+               measure(lambda i: index.score_resumes(job_id, features[:50]), iterations))
+
+        appmod.resume_cache.clear()
+        record(f"job_recommendations[jobs={size}]",
+               measure(lambda i: upload(i, "/api/jobs/recommendations"), iterations))
+
+    return results
+
+
+@click.group()
+def cli():
+    """Benchmark the resume scoring and recommendation hot paths."""
+
+
+@cli.command()
+@click.option("--jobs", default="100,1000,10000", help="Comma-separated job corpus sizes.")
+@click.option("--pages", default="1,5,20", help="Comma-separated resume page counts for extraction.")
+@click.option("--iterations", default=30, help="Timed iterations per stage.")
+@click.option("--llm-latency", default=0.0, help="Seconds the fake LLM waits before answering.")
+@click.option("--ann/--no-ann", default=True, help="Also benchmark ANN candidate retrieval on large corpora.")
+@click.option("--seed", default=0, help="Seed for the synthetic data generators.")
+@click.option("--output", type=click.Path(dir_okay=False), help="Write the results to this JSON file.")
+def run(jobs, pages, iterations, llm_latency, ann, seed, output):
+    """Run every stage and optionally save the results as a JSON baseline."""
+    params = {
+        "jobs": [int(size) for size in jobs.split(",")],
+        "pages": [int(count) for count in pages.split(",")],
+        "iterations": iterations,
+        "llm_latency": llm_latency,
+        "ann": ann,
+        "seed": seed
+    }
+    results = run_benchmarks(params["jobs"], params["pages"], iterations, llm_latency, ann, seed)
+    if output:
+        with open(output, "w") as f:
+            json.dump({
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "params": params,
+                "results": results
+            }, f, indent=2)
+        click.echo(f"Saved {len(results)} stages to {output}")
+
+
+@cli.command()
+@click.argument("baseline", type=click.File())
+@click.argument("current", type=click.File())
+@click.option("--threshold", default=0.15, help="Relative increase counted as a regression.")
+def compare(baseline, current, threshold):
+    """Diff two result files and exit non-zero if any stage regressed."""
+    baseline, current = json.load(baseline), json.load(current)
+    if baseline.get("params") != current.get("params"):
+        click.echo("Warning: the runs used different parameters", err=True)
+
+    regressions = []
+    for name, before in baseline["results"].items():
+        after = current["results"].get(name)
+        if after is None:
+            click.echo(f"{name:<45} missing from current run")
+            continue
+        changes = []
+        for metric in ("p50_ms", "p99_ms", "peak_memory_kb"):
+            change = (after[metric] - before[metric]) / before[metric] if before[metric] else 0.0
+            flag = change > threshold
+            changes.append(f"{metric} {before[metric]:.2f} -> {after[metric]:.2f} ({change:+.0%}){' !' if flag else ''}")
+            if flag:
+                regressions.append((name, metric))
+        click.echo(f"{name:<45} " + ", ".join(changes))
+
+    if regressions:
+        click.echo(f"{len(regressions)} regressions above {threshold:.0%}", err=True)
+        raise SystemExit(1)
+    click.echo("No regressions")
+
+
+if __name__ == "__main__":
+    cli()
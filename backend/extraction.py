@@ -0,0 +1,26 @@
+"""Document text extraction run inside the PDF process pool.
+
+Pool workers are started with spawn/forkserver and only import this module,
+so nothing here may touch the Flask app, MongoDB, loggers or any lock that
+app.py shares between threads.
+"""
+import io
+
+def extract_pdf_pages(content, start, stop):
+    """Extract the text of pages [start, stop) from an in-memory PDF."""
+    from PyPDF2 import PdfReader
+    reader = PdfReader(io.BytesIO(content))
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+def extract_document_text(content, file_type, max_pages):
+    """Return the text of a PDF (first ``max_pages`` pages) or DOCX document, or None if it has none."""
+    if file_type == "pdf":
+        from PyPDF2 import PdfReader
+        reader = PdfReader(io.BytesIO(content))
+        pages = [reader.pages[i].extract_text() or "" for i in range(min(len(reader.pages), max_pages))]
+    elif file_type == "docx":
+        from docx import Document
+        pages = [para.text for para in Document(io.BytesIO(content)).paragraphs if para.text.strip()]
+    else:
+        pages = []
+    return "\n".join(page for page in pages if page).strip() or None
@@ -22,14 +22,34 @@ interface Application {
   resume_url?: string;
 }
 
+interface JobStats {
+  job_id: string;
+  name: string;
+  position: string;
+  total: number;
+  by_status: { [status: string]: number };
+  score_histogram: number[];
+  top_candidates: {
+    application_id: string;
+    user: {
+      id: string;
+      email: string;
+    };
+    overall_match: number;
+    status: string;
+  }[];
+}
+
 const HRDashboard: React.FC = () => {
   const [applications, setApplications] = useState<Application[]>([]);
   const [error, setError] = useState<string | null>(null);
   const [companies, setCompanies] = useState<any[]>([]);
   const [selectedCompany, setSelectedCompany] = useState<string | null>(null);
+  const [jobStats, setJobStats] = useState<JobStats[]>([]);
 
   useEffect(() => {
     fetchCompanies();
+    fetchDashboard();
   }, []);
 
   useEffect(() => {
@@ -54,6 +74,18 @@ const HRDashboard: React.FC = () => {
     }
   };
 
+  const fetchDashboard = async () => {
+    try {
+      const token = getAuthToken();
+      const response = await axios.get('http://localhost:5000/api/dashboard', {
+        headers: { Authorization: `Bearer ${token}` }
+      });
+      setJobStats(response.data.jobs);
+    } catch (error) {
+      console.error('Error fetching dashboard stats:', error);
+    }
+  };
+
   const fetchApplications = async (jobId: string) => {
     try {
       const token = getAuthToken();
@@ -86,10 +118,11 @@ const HRDashboard: React.FC = () => {
       
       // Clear any existing error
       setError(null);
-      // Refresh the applications list
+      // Refresh the applications list and counters
       if (selectedCompany) {
         await fetchApplications(selectedCompany);
       }
+      fetchDashboard();
     } catch (error: any) {
       console.error('Error updating application status:', error);
       let errorMessage = 'Failed to update application status. Please try again.';
@@ -133,6 +166,8 @@ const HRDashboard: React.FC = () => {
     }
   };
 
+  const selectedStats = jobStats.find((job) => job.job_id === selectedCompany);
+
   const handleRemoveRejected = async () => {
     try {
       const token = getAuthToken();
@@ -142,6 +177,7 @@ const HRDashboard: React.FC = () => {
       if (selectedCompany) {
         fetchApplications(selectedCompany);
       }
+      fetchDashboard();
     } catch (error) {
       console.error('Error removing rejected applications:', error);
       setError('Failed to remove rejected applications. Please try again.');
@@ -196,6 +232,47 @@ const HRDashboard: React.FC = () => {
         </div>
       </div>
 
+      {selectedStats && (
+        <div className="bg-white/80 backdrop-blur-xl rounded-xl shadow-xl mb-6 border border-indigo-300/50 hover:border-indigo-400/50 transition-all duration-300 hover:shadow-indigo-200/30">
+          <div className="px-6 py-4 bg-gradient-to-r from-indigo-500/30 via-indigo-400/30 to-indigo-300/30 border-b border-indigo-300/40">
+            <h2 className="text-2xl font-bold text-indigo-700 mb-1 filter drop-shadow-lg">Overview</h2>
+          </div>
+          <div className="px-6 py-4">
+            <div className="grid grid-cols-2 md:grid-cols-4 gap-4 mb-6">
+              {[
+                ['Total', selectedStats.total],
+                ['Pending', selectedStats.by_status.pending || 0],
+                ['Accepted', selectedStats.by_status.accepted || 0],
+                ['Rejected', selectedStats.by_status.rejected || 0]
+              ].map(([label, count]) => (
+                <div key={label} className="bg-indigo-100/80 backdrop-blur-sm p-4 rounded-xl border border-indigo-300/50 hover:border-indigo-400/50 transition-all duration-300 hover:shadow-indigo-200/30">
+                  <p className="font-bold text-indigo-700 text-2xl">{count}</p>
+                  <p className="text-indigo-600 text-sm mt-1">{label}</p>
+                </div>
+              ))}
+            </div>
+            <h3 className="text-lg font-medium text-indigo-700 mb-4">Top Candidates</h3>
+            {selectedStats.top_candidates.length === 0 ? (
+              <p className="text-indigo-400 italic">No scored applications yet.</p>
+            ) : (
+              <ul className="divide-y divide-indigo-200/60">
+                {selectedStats.top_candidates.map((candidate) => (
+                  <li key={candidate.application_id} className="py-2 flex justify-between items-center">
+                    <span className="text-indigo-700">{candidate.user.email}</span>
+                    <span className="flex items-center space-x-4">
+                      <span className="font-semibold text-indigo-700">{candidate.overall_match.toFixed(1)}%</span>
+                      <span className={`text-sm font-medium ${getStatusColor(candidate.status)}`}>
+                        {candidate.status.charAt(0).toUpperCase() + candidate.status.slice(1)}
+                      </span>
+                    </span>
+                  </li>
+                ))}
+              </ul>
+            )}
+          </div>
+        </div>
+      )}
+
       {selectedCompany && (
         <div className="bg-white/80 backdrop-blur-xl rounded-xl shadow-xl overflow-hidden border border-indigo-300/50 hover:border-indigo-400/50 transition-all duration-300 hover:shadow-indigo-200/30">
           <div className="px-6 py-4 bg-gradient-to-r from-indigo-500/30 via-indigo-400/30 to-indigo-300/30 border-b border-indigo-300/40 flex justify-between items-center">
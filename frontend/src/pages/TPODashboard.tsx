@@ -15,6 +15,30 @@ interface Company {
   location: string;
 }
 
+interface JobStats {
+  job_id: string;
+  total: number;
+  by_status: { [status: string]: number };
+  top_candidates: {
+    application_id: string;
+    user: {
+      id: string;
+      email: string;
+    };
+    overall_match: number;
+    status: string;
+  }[];
+}
+
+interface DashboardStats {
+  jobs: JobStats[];
+  totals: {
+    jobs: number;
+    applications: number;
+    by_status: { [status: string]: number };
+  };
+}
+
 const TPODashboard: React.FC = () => {
   const [companies, setCompanies] = useState<Company[]>([]);
   const [loading, setLoading] = useState<boolean>(true);
@@ -29,11 +53,48 @@ const TPODashboard: React.FC = () => {
   const [salaryMax, setSalaryMax] = useState('');
   const [location, setLocation] = useState('');
   const [editingCompany, setEditingCompany] = useState<Company | null>(null);
+  const [dashboard, setDashboard] = useState<DashboardStats | null>(null);
 
   useEffect(() => {
     fetchCompanies();
+    fetchDashboard();
   }, []);
 
+  const fetchDashboard = async () => {
+    try {
+      const token = getAuthToken();
+      const response = await axios.get('http://localhost:5000/api/dashboard', {
+        headers: { Authorization: `Bearer ${token}` }
+      });
+      setDashboard(response.data);
+    } catch (error) {
+      console.error('Error fetching dashboard stats:', error);
+    }
+  };
+
+  const statsFor = (companyId: string) => dashboard?.jobs.find((job) => job.job_id === companyId);
+
+  const renderStats = (stats: JobStats) => (
+    <>
+      <p className="font-medium text-fuchsia-200 mt-3">Applications:</p>
+      <p className="mt-1">
+        {stats.total} total ({stats.by_status.pending || 0} pending, {stats.by_status.accepted || 0} accepted, {stats.by_status.rejected || 0} rejected)
+      </p>
+      {stats.top_candidates.length > 0 && (
+        <>
+          <p className="font-medium text-fuchsia-200 mt-3">Top Candidates:</p>
+          <ul className="mt-1 space-y-1">
+            {stats.top_candidates.map((candidate) => (
+              <li key={candidate.application_id}>
+                {candidate.user.email} - {candidate.overall_match.toFixed(1)}% ({candidate.status})
+              </li>
+            ))}
+          </ul>
+        </>
+      )}
+    </>
+  );
+
   const fetchCompanies = async () => {
     try {
       setError(null);
@@ -102,6 +163,7 @@ const TPODashboard: React.FC = () => {
         if (response.status === 200) {
           resetForm();
           fetchCompanies();
+          fetchDashboard();
         } else {
           console.error('Failed to update company:', response);
           alert('Failed to update company. Please try again.');
@@ -115,6 +177,7 @@ const TPODashboard: React.FC = () => {
         });
         resetForm();
         fetchCompanies();
+        fetchDashboard();
       }
     } catch (error) {
       console.error('Error submitting company:', error);
@@ -169,6 +232,7 @@ const TPODashboard: React.FC = () => {
           headers: { Authorization: `Bearer ${token}` }
         });
         fetchCompanies();
+        fetchDashboard();
       } catch (error) {
         console.error('Error deleting company:', error);
       }
@@ -202,6 +266,22 @@ const TPODashboard: React.FC = () => {
           </div>
         ) : (
           <>
+            {dashboard && (
+              <div className="grid grid-cols-2 md:grid-cols-5 gap-4 mb-8">
+                {[
+                  ['Job Listings', dashboard.totals.jobs],
+                  ['Applications', dashboard.totals.applications],
+                  ['Pending', dashboard.totals.by_status.pending || 0],
+                  ['Accepted', dashboard.totals.by_status.accepted || 0],
+                  ['Rejected', dashboard.totals.by_status.rejected || 0]
+                ].map(([label, count]) => (
+                  <div key={label} className="bg-white/70 backdrop-blur-xl rounded-xl shadow-xl p-4 border border-teal-200/50 hover:border-teal-300/50 transition-all duration-300">
+                    <p className="text-3xl font-bold text-teal-700">{count}</p>
+                    <p className="text-sm text-teal-600 mt-1">{label}</p>
+                  </div>
+                ))}
+              </div>
+            )}
             <div className="bg-white/70 backdrop-blur-xl rounded-xl shadow-xl p-6 mb-8 border border-teal-200/50 hover:border-teal-300/50 transition-all duration-300">
               <h2 className="text-2xl font-bold text-teal-700 mb-6 filter drop-shadow-lg">{editingCompany ? 'Edit Job Listing' : 'Add New Company'}</h2>
               <form onSubmit={handleSubmit} className="space-y-6">
@@ -376,6 +456,7 @@ const TPODashboard: React.FC = () => {
                       <p className="mt-1">${(company.salary_min || 0).toLocaleString()} - ${(company.salary_max || 0).toLocaleString()}</p>
                       <p className="font-medium text-fuchsia-200 mt-3">HR Code:</p>
                       <p className="mt-1">{company.hr_code}</p>
+                      {statsFor(company._id) && renderStats(statsFor(company._id)!)}
                     </div>
                   </div>
                 ))}